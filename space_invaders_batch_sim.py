@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Space Invaders batch simulator
+Plays many seeded headless games across all cores and aggregates per-wave
+metrics for balancing spawn_wave, enemy shoot timers and boss phases.
+
+Usage:
+    python space_invaders_batch_sim.py --games 200 --policy random
+    python space_invaders_batch_sim.py --games 50 --start-wave 5 --out boss.npz
+    python space_invaders_batch_sim.py --games 20 --policy autopilot
+"""
+
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+# Let Pool.terminate() stop workers; SDL would otherwise swallow SIGTERM
+os.environ.setdefault("SDL_NO_SIGNAL_HANDLERS", "1")
+
+import argparse
+import json
+import random
+import time
+import multiprocessing
+
+import numpy as np
+
+from space_invaders_bullet_hell import Autopilot, Controls, Game, GameState
+
+# One row per (game, wave) played; written column by column
+COLUMNS = (
+    ('seed', np.int64),
+    ('wave', np.int16),
+    ('ticks', np.int32),          # Time spent in the wave (time-to-clear if cleared)
+    ('cleared', np.bool_),
+    ('bullets_mean', np.float32),  # Live bullets, averaged over the wave's ticks
+    ('bullets_peak', np.int32),
+    ('damage', np.int16),         # Lives lost during the wave
+    ('score', np.int32),          # Score gained during the wave
+    ('deaths', np.int8),          # 1 if the run ended in this wave
+)
+
+
+def sweep_policy(seed: int):
+    """Fire constantly and sweep the bottom of the screen edge to edge."""
+    state = {'direction': Controls.RIGHT}
+
+    def policy(game: Game) -> int:
+        if game.player.x >= 760:
+            state['direction'] = Controls.LEFT
+        elif game.player.x <= 40:
+            state['direction'] = Controls.RIGHT
+        return Controls.FIRE | state['direction']
+    return policy
+
+
+def random_policy(seed: int):
+    """Fire constantly, wander randomly, and bomb when fire gets close."""
+    rng = random.Random(seed ^ 0x5EED)
+    state = {'controls': Controls.FIRE, 'hold': 0}
+
+    def policy(game: Game) -> int:
+        if state['hold'] <= 0:
+            state['controls'] = Controls.FIRE | rng.choice(
+                [0, Controls.LEFT, Controls.RIGHT, Controls.LEFT, Controls.RIGHT, Controls.UP, Controls.DOWN])
+            state['hold'] = rng.randint(5, 40)
+        state['hold'] -= 1
+        controls = state['controls']
+        # Stay in the lower part of the screen
+        if game.player.y < 380:
+            controls = (controls & ~Controls.UP) | Controls.DOWN
+
+        bullets = game.bullets
+        n = bullets.count
+        hostile = ~bullets.is_player[:n]
+        close = ((np.abs(bullets.x[:n] - game.player.x) < 40)
+                 & (np.abs(bullets.y[:n] - game.player.y) < 60) & hostile)
+        if np.count_nonzero(close) >= 3:
+            controls |= Controls.BOMB
+        return int(controls)
+    return policy
+
+
+def autopilot_policy(seed: int):
+    """Dodge with the game's built-in Autopilot; clears all 15 waves."""
+    return Autopilot()
+
+
+POLICIES = {
+    'sweep': sweep_policy,
+    'random': random_policy,
+    'autopilot': autopilot_policy,
+}
+
+
+def play(job) -> dict:
+    """Play one seeded game to the end (or max_ticks) and return its wave rows."""
+    seed, policy_name, max_ticks, start_wave = job
+    game = Game(headless=True, seed=seed, input_source=POLICIES[policy_name](seed))
+    if start_wave != 1:
+        game.jump_to_wave(start_wave)
+
+    rows = {name: [] for name, _ in COLUMNS}
+
+    def close_wave(cleared: bool, died: bool):
+        rows['seed'].append(seed)
+        rows['wave'].append(wave)
+        rows['ticks'].append(ticks)
+        rows['cleared'].append(cleared)
+        rows['bullets_mean'].append(bullet_sum / max(ticks, 1))
+        rows['bullets_peak'].append(bullet_peak)
+        rows['damage'].append(damage)
+        rows['score'].append(game.player.score - score_at_start)
+        rows['deaths'].append(1 if died else 0)
+
+    wave = game.wave
+    ticks = bullet_sum = bullet_peak = damage = 0
+    score_at_start = game.player.score
+    lives = game.player.lives
+    for _ in range(max_ticks):
+        if not game.step(1):
+            break
+        ticks += 1
+        alive = len(game.bullets)
+        bullet_sum += alive
+        bullet_peak = max(bullet_peak, alive)
+        if game.player.lives < lives:
+            damage += lives - game.player.lives
+        lives = game.player.lives
+
+        if game.state == GameState.GAME_OVER:
+            close_wave(False, True)
+            break
+        if game.state == GameState.VICTORY or game.wave != wave:
+            close_wave(True, False)
+            if game.state == GameState.VICTORY:
+                break
+            wave = game.wave
+            ticks = bullet_sum = bullet_peak = damage = 0
+            score_at_start = game.player.score
+    else:
+        # Ran out of ticks mid-wave
+        close_wave(False, False)
+    return rows
+
+
+def run_batch(games: int, policy: str, max_ticks: int, base_seed: int = 0,
+              start_wave: int = 1, workers: int = 0) -> dict:
+    """Play `games` seeded games on a process pool; returns columnar arrays."""
+    jobs = [(base_seed + i, policy, max_ticks, start_wave) for i in range(games)]
+    workers = workers or os.cpu_count() or 1
+    columns = {name: [] for name, _ in COLUMNS}
+    # Games are independent and results are small, so big chunks keep IPC low
+    chunksize = max(1, games // (workers * 4))
+    # Spawn rather than fork: forked children can deadlock on SDL's threads
+    with multiprocessing.get_context('spawn').Pool(workers) as pool:
+        for rows in pool.imap_unordered(play, jobs, chunksize=chunksize):
+            for name, values in rows.items():
+                columns[name].extend(values)
+        pool.close()
+        pool.join()
+    return {name: np.asarray(columns[name], dtype=dtype) for name, dtype in COLUMNS}
+
+
+def summarize(columns: dict) -> list:
+    """Aggregate the per-game rows into one summary row per wave."""
+    summary = []
+    for wave in np.unique(columns['wave']):
+        rows = columns['wave'] == wave
+        cleared = columns['cleared'][rows]
+        ticks = columns['ticks'][rows]
+        summary.append({
+            'wave': int(wave),
+            'games': int(rows.sum()),
+            'clear_rate': float(cleared.mean()),
+            'clear_ticks_median': float(np.median(ticks[cleared])) if cleared.any() else None,
+            'bullets_mean': float(columns['bullets_mean'][rows].mean()),
+            'bullets_peak': int(columns['bullets_peak'][rows].max()),
+            'damage_mean': float(columns['damage'][rows].mean()),
+            'score_mean': float(columns['score'][rows].mean()),
+            'deaths': int(columns['deaths'][rows].sum()),
+        })
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='random')
+    parser.add_argument('--max-ticks', type=int, default=60 * 60 * 10,
+                        help='Tick budget per game (default: 10 minutes of play)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the first game')
+    parser.add_argument('--start-wave', type=int, default=1)
+    parser.add_argument('--workers', type=int, default=0, help='Default: all cores')
+    parser.add_argument('--out', default='batch_results.npz')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    columns = run_batch(args.games, args.policy, args.max_ticks, args.seed,
+                        args.start_wave, args.workers)
+    elapsed = time.perf_counter() - start
+    summary = summarize(columns)
+    meta = {'games': args.games, 'policy': args.policy, 'max_ticks': args.max_ticks,
+            'seed': args.seed, 'start_wave': args.start_wave, 'summary': summary}
+    np.savez_compressed(args.out, meta=np.array(json.dumps(meta)), **columns)
+
+    print(f"{args.games} games, {int(columns['ticks'].sum())} ticks in {elapsed:.1f}s "
+          f"({columns['ticks'].sum() / elapsed:,.0f} ticks/s)")
+    print(f"{'wave':>4} {'games':>5} {'clear%':>6} {'ticks':>7} {'bullets':>7} "
+          f"{'peak':>5} {'damage':>6} {'score':>8} {'deaths':>6}")
+    for row in summary:
+        ticks = row['clear_ticks_median']
+        print(f"{row['wave']:>4} {row['games']:>5} {row['clear_rate'] * 100:>5.0f}% "
+              f"{ticks if ticks is not None else '-':>7} {row['bullets_mean']:>7.1f} "
+              f"{row['bullets_peak']:>5} {row['damage_mean']:>6.2f} {row['score_mean']:>8.0f} "
+              f"{row['deaths']:>6}")
+    print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
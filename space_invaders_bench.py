@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Space Invaders benchmarks
+Times Game.update, handle_collisions and draw_game headlessly on synthetic
+worst-case states, and compares the results against a saved baseline.
+
+Usage:
+    python space_invaders_bench.py --save bench_baseline.json
+    python space_invaders_bench.py --compare bench_baseline.json --threshold 0.2
+    python space_invaders_bench.py --pipeline 1200
+"""
+
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import gc
+import json
+import math
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+import pygame
+
+from space_invaders_bullet_hell import (
+    Boss, Bullet, Controls, Enemy, Game, PowerUp, PowerUpType, RenderPipeline, ScriptedInput, Vector2,
+    SCREEN_WIDTH, SCREEN_HEIGHT, ORANGE, PURPLE, RED, YELLOW,
+)
+
+
+def hostile_bullets(rng: random.Random, count: int) -> list:
+    """Enemy bullets scattered over the screen, moving in random directions."""
+    bullets = []
+    for _ in range(count):
+        angle = rng.uniform(0, 2 * math.pi)
+        speed = rng.uniform(2, 6)
+        bullets.append(Bullet(rng.uniform(10, SCREEN_WIDTH - 10), rng.uniform(10, SCREEN_HEIGHT - 10),
+                              Vector2(math.cos(angle) * speed, math.sin(angle) * speed),
+                              rng.choice((RED, ORANGE, PURPLE)), rng.choice((5, 6)), 1, False))
+    return bullets
+
+
+def full_formation(game: Game):
+    """Replace the current wave with a full on-screen 6x10 formation."""
+    game.boss = None
+    game.boss_wave = False
+    game.wave = 12
+    game.wave_delay = 0
+    game.formation.clear()
+    game.formation.extend([Enemy(100 + col * 70, 60 + row * 45, min(row // 2, 3), game.rng)
+                           for row in range(6) for col in range(10)])
+
+
+def formation_scenario(seed: int) -> Game:
+    """Full formation under fire from a spread-shot player."""
+    game = Game(headless=True, seed=seed)
+    full_formation(game)
+    game.player.apply_powerup(PowerUpType.SPREAD_SHOT)
+    game.player.apply_powerup(PowerUpType.RAPID_FIRE)
+    for _ in range(12):
+        game.bullets.extend(game.player.shoot())
+        game.bullets.update()
+        game.player.shoot_cooldown = 0
+    game.bullets.extend(hostile_bullets(game.rng, 150))
+    return game
+
+
+def boss_scenario(seed: int) -> Game:
+    """Phase-2 boss on screen with 1,000 bullets in flight."""
+    game = Game(headless=True, seed=seed)
+    game.formation.clear()
+    game.wave = 15
+    game.wave_delay = 0
+    game.boss_wave = True
+    game.boss = Boss(3, game.rng)
+    game.boss.entering = False
+    game.boss.y = game.boss.target_y
+    game.boss.health = int(game.boss.max_health * 0.25)
+    game.boss.phase = 2
+    game.bullets.extend(hostile_bullets(game.rng, 1000))
+    return game
+
+
+def bomb_scenario(seed: int) -> Game:
+    """Full formation plus a screen of enemy fire, right before a bomb."""
+    game = Game(headless=True, seed=seed)
+    full_formation(game)
+    game.bullets.extend(hostile_bullets(game.rng, 400))
+    game.powerups.clear()
+    game.powerups.extend([PowerUp(80 + i * 90, 200 + (i % 3) * 60, list(PowerUpType)[i % len(PowerUpType)])
+                          for i in range(8)])
+    return game
+
+
+def detonated_scenario(seed: int) -> Game:
+    """The frame right after a bomb over a full wave: debris everywhere."""
+    game = bomb_scenario(seed)
+    game.use_bomb()
+    return game
+
+
+def particles_scenario(seed: int) -> Game:
+    """5,000 live particles from explosions all over the screen."""
+    game = Game(max_particles=8192, headless=True, seed=seed)
+    rng = random.Random(seed)
+    for _ in range(100):
+        game.spawn_explosion(rng.uniform(50, SCREEN_WIDTH - 50), rng.uniform(50, SCREEN_HEIGHT - 50),
+                             rng.choice((RED, ORANGE, PURPLE, YELLOW)), 50)
+    return game
+
+
+# Each target runs once on a freshly built state
+TARGETS = {
+    'update': lambda game: game.update(Controls.FIRE),
+    'collisions': lambda game: game.handle_collisions(),
+    'draw': lambda game: game.draw_game(),
+}
+
+SCENARIOS = {
+    'formation': (formation_scenario, TARGETS),
+    'boss_1000': (boss_scenario, TARGETS),
+    'bomb': (bomb_scenario, {'detonate': lambda game: game.use_bomb()}),
+    'bomb_aftermath': (detonated_scenario, TARGETS),
+    'particles_5000': (particles_scenario, TARGETS),
+}
+
+
+def measure(build, target, repeats: int, warmup: int, seed: int) -> dict:
+    """Time `target` on `repeats` fresh states; returns stats in milliseconds."""
+    samples = []
+    for i in range(warmup + repeats):
+        game = build(seed)
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter_ns()
+            target(game)
+            elapsed = time.perf_counter_ns() - start
+        finally:
+            gc.enable()
+        if i >= warmup:
+            samples.append(elapsed / 1e6)
+    samples = np.asarray(samples)
+    return {
+        'median_ms': float(np.median(samples)),
+        'p90_ms': float(np.percentile(samples, 90)),
+        'min_ms': float(samples.min()),
+    }
+
+
+def run(names: list, repeats: int, warmup: int, seed: int) -> dict:
+    results = {}
+    for name in names:
+        build, targets = SCENARIOS[name]
+        for target_name, target in targets.items():
+            results[f'{name}.{target_name}'] = measure(build, target, repeats, warmup, seed)
+    return results
+
+
+def scripted_game(seed: int, frames: int) -> Game:
+    """A game from wave 10 on, driven by seeded random controls."""
+    rng = random.Random(seed)
+    script = [Controls.FIRE | rng.choice((0, Controls.LEFT, Controls.RIGHT, Controls.UP, Controls.DOWN))
+              for _ in range(frames // 8 + 1) for _ in range(8)]
+    game = Game(headless=True, seed=seed, input_source=ScriptedInput(script))
+    game.jump_to_wave(10)
+    return game
+
+
+def pipeline_benchmark(frames: int, seed: int) -> dict:
+    """Play the same frames single-threaded and pipelined, one tick per frame.
+
+    Returns ms per frame for both modes and whether they ended in the same
+    state (the pipeline must not change the simulation).
+    """
+    results = {}
+    ends = {}
+    for mode in ('single', 'pipelined'):
+        game = scripted_game(seed, frames)
+        pipeline = RenderPipeline(game) if mode == 'pipelined' else None
+        start = time.perf_counter()
+        for _ in range(frames):
+            if pipeline:
+                pipeline.frame(1, 1.0)
+            else:
+                game.advance(1)
+                game.draw(1.0)
+        if pipeline:
+            pipeline.close()
+        results[mode] = (time.perf_counter() - start) * 1000 / frames
+        ends[mode] = game.snapshot()
+    results['identical'] = ends['single'] == ends['pipelined']
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta: float) -> list:
+    """Names of benchmarks whose median regressed past the threshold."""
+    regressed = []
+    for key, row in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        delta = row['median_ms'] - base['median_ms']
+        if delta > min_delta and delta > base['median_ms'] * threshold:
+            regressed.append(key)
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('scenarios', nargs='*', metavar='SCENARIO',
+                        help=f"Scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument('--repeats', type=int, default=40)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--save', metavar='PATH', help='Write results as a baseline file')
+    parser.add_argument('--compare', metavar='PATH', help='Baseline file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed median slowdown as a fraction (default: 0.25)')
+    parser.add_argument('--min-delta', type=float, default=0.05,
+                        help='Ignore slowdowns smaller than this many ms (default: 0.05)')
+    parser.add_argument('--pipeline', type=int, metavar='FRAMES',
+                        help='Instead: time FRAMES frames single-threaded vs RenderPipeline')
+    args = parser.parse_args()
+
+    if args.pipeline:
+        result = pipeline_benchmark(args.pipeline, args.seed)
+        print(f"single    {result['single']:.3f} ms/frame")
+        print(f"pipelined {result['pipelined']:.3f} ms/frame "
+              f"({result['single'] / result['pipelined']:.2f}x, {os.cpu_count()} cpu)")
+        print("states identical" if result['identical'] else "STATES DIFFER")
+        sys.exit(0 if result['identical'] else 1)
+
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+    results = run(names, args.repeats, args.warmup, args.seed)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+    regressed = compare(results, baseline, args.threshold, args.min_delta)
+
+    print(f"{'benchmark':<28} {'median':>8} {'p90':>8} {'min':>8} {'baseline':>9} {'change':>7}")
+    for key, row in results.items():
+        base = baseline.get(key)
+        line = f"{key:<28} {row['median_ms']:>8.3f} {row['p90_ms']:>8.3f} {row['min_ms']:>8.3f}"
+        if base:
+            change = (row['median_ms'] / base['median_ms'] - 1) * 100 if base['median_ms'] else 0.0
+            line += f" {base['median_ms']:>9.3f} {change:>+6.0f}%"
+            if key in regressed:
+                line += '  REGRESSED'
+        print(line)
+
+    if args.save:
+        meta = {'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'repeats': args.repeats,
+                'seed': args.seed, 'python': platform.python_version(),
+                'pygame': pygame.version.ver, 'numpy': np.__version__,
+                'machine': platform.machine(), 'processor': platform.processor()}
+        with open(args.save, 'w') as f:
+            json.dump({'meta': meta, 'results': results}, f, indent=1)
+        print(f"Wrote {args.save}")
+
+    if regressed:
+        print(f"{len(regressed)} benchmark(s) regressed by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,20 +5,45 @@ A classic shooter with bullet hell mechanics, power-ups, and boss fights.
 """
 
 import pygame
+import os
 import random
 import math
-from enum import Enum
+import time
+import heapq
+import json
+import platform
+import queue
+import socket
+import sqlite3
+import struct
+import sys
+import threading
+import zlib
+import numpy as np
+from contextlib import contextmanager
+from enum import Enum, IntFlag
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
 # Initialize Pygame
 pygame.init()
-pygame.mixer.init()
+try:
+    pygame.mixer.init()
+except pygame.error:
+    pass  # No audio device (e.g. headless runs); the game has no sound yet
 
 # Constants
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
-FPS = 60
+FPS = 60                  # Simulation ticks per second; all motion is per tick
+SIM_DT = 1.0 / FPS
+MAX_CATCHUP_STEPS = 5     # Ticks simulated per rendered frame before dropping backlog
+MAX_RENDER_FPS = 240
+MAX_PARTICLES = 4096
+KEYFRAME_INTERVAL = 600   # Ticks between replay seek keyframes
+SPECTATOR_KEYFRAMES = 120  # Ticks between spectator stream keyframes
+SCORES_PATH = "scores.db"
+TOP_SCORES = 10           # Rows kept in the high score table
 
 # Colors
 BLACK = (0, 0, 0)
@@ -49,36 +74,341 @@ class PowerUpType(Enum):
     EXTRA_LIFE = 5
 
 
+class Controls(IntFlag):
+    """One tick of player input as a bitmask."""
+    LEFT = 1
+    RIGHT = 2
+    UP = 4
+    DOWN = 8
+    FIRE = 16
+    BOMB = 32   # Edge-triggered: set only on the tick the key went down
+    PAUSE = 64  # Edge-triggered
+
+
 @dataclass
 class Vector2:
+    __slots__ = ('x', 'y')
     x: float
     y: float
 
 
-class Particle:
-    """Simple particle for visual effects."""
-    def __init__(self, x: float, y: float, color: tuple, velocity: Vector2, lifetime: int):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.velocity = velocity
-        self.lifetime = lifetime
-        self.max_lifetime = lifetime
+def lerp(a: float, b: float, t: float) -> float:
+    return a + (b - a) * t
 
-    def update(self):
-        self.x += self.velocity.x
-        self.y += self.velocity.y
-        self.lifetime -= 1
-        return self.lifetime > 0
 
-    def draw(self, screen):
-        alpha = int(255 * (self.lifetime / self.max_lifetime))
-        size = max(1, int(4 * (self.lifetime / self.max_lifetime)))
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), size)
+class SpriteCache:
+    """Pre-rendered sprites for every visual variant of the game's entities.
+
+    Each variant is drawn once from primitives on first use and kept as a
+    surface, so drawing an entity becomes a single blit. Lookups return the
+    sprite with the offset from its top-left corner to the entity center.
+
+    Sprites are built at the render scale (logical pixels per game unit), so
+    a half-resolution canvas gets half-size sprites; the scale is shared by
+    everything drawn in the process.
+    """
+    def __init__(self):
+        self.sprites = {}
+        self.scale = 1.0
+
+    def set_scale(self, scale: float):
+        """Build sprites for a canvas `scale` times the game's size from now on."""
+        if scale != self.scale:
+            self.scale = scale
+            self.sprites.clear()
+
+    def size(self, length: float) -> int:
+        """A length in game units as whole logical pixels (at least 1)."""
+        return max(1, int(length * self.scale + 0.5))
+
+    def _finish(self, key, surface: pygame.Surface, center: tuple):
+        if self.scale != 1.0:
+            width, height = surface.get_size()
+            surface = pygame.transform.smoothscale(surface, (self.size(width), self.size(height)))
+            center = (int(center[0] * self.scale), int(center[1] * self.scale))
+        # convert_alpha needs a display; headless surfaces stay as they are
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        self.sprites[key] = (surface, center)
+        return self.sprites[key]
+
+    def enemy(self, color: tuple):
+        key = ('enemy', color)
+        if key in self.sprites:
+            return self.sprites[key]
+        surface = pygame.Surface((30, 25), pygame.SRCALPHA)
+        # Alien body
+        pygame.draw.rect(surface, color, (0, 0, 30, 25), border_radius=5)
+        # Eyes
+        for eye_x in (8, 22):
+            pygame.draw.circle(surface, WHITE, (eye_x, 9), 5)
+            pygame.draw.circle(surface, BLACK, (eye_x, 9), 2)
+        return self._finish(key, surface, (15, 12))
+
+    def boss(self, core_color: tuple):
+        key = ('boss', core_color)
+        if key in self.sprites:
+            return self.sprites[key]
+        surface = pygame.Surface((120, 80), pygame.SRCALPHA)
+        # Main body
+        pygame.draw.rect(surface, PURPLE, (0, 0, 120, 80), border_radius=10)
+        pygame.draw.rect(surface, WHITE, (0, 0, 120, 80), 3, border_radius=10)
+        # Core
+        pygame.draw.circle(surface, core_color, (60, 40), 20)
+        pygame.draw.circle(surface, WHITE, (60, 40), 20, 2)
+        # Eyes
+        for eye_x in (30, 90):
+            pygame.draw.circle(surface, YELLOW, (eye_x, 25), 12)
+            pygame.draw.circle(surface, RED, (eye_x, 25), 6)
+        return self._finish(key, surface, (60, 40))
+
+    def powerup(self, powerup_type: 'PowerUpType', color: tuple, radius: int):
+        """One frame of the pulsing power-up, keyed by its current radius."""
+        key = ('powerup', powerup_type, radius)
+        if key in self.sprites:
+            return self.sprites[key]
+        size = radius * 2 + 1
+        surface = pygame.Surface((size, size), pygame.SRCALPHA)
+        cx = cy = radius
+        pygame.draw.circle(surface, color, (cx, cy), radius)
+        pygame.draw.circle(surface, WHITE, (cx, cy), radius, 2)
+
+        # Icon based on type
+        if powerup_type == PowerUpType.RAPID_FIRE:
+            pygame.draw.polygon(surface, WHITE, [
+                (cx, cy - 8), (cx - 6, cy + 6), (cx + 6, cy + 6)
+            ])
+        elif powerup_type == PowerUpType.SPREAD_SHOT:
+            for angle in [-30, 0, 30]:
+                rad = math.radians(angle - 90)
+                pygame.draw.line(surface, WHITE, (cx, cy),
+                               (cx + math.cos(rad) * 10, cy + math.sin(rad) * 10), 2)
+        elif powerup_type == PowerUpType.SHIELD:
+            pygame.draw.circle(surface, WHITE, (cx, cy), 8, 2)
+        elif powerup_type == PowerUpType.BOMB:
+            pygame.draw.circle(surface, WHITE, (cx, cy), 6)
+        elif powerup_type == PowerUpType.EXTRA_LIFE:
+            # Heart shape
+            pygame.draw.polygon(surface, WHITE, [
+                (cx, cy + 6), (cx - 8, cy - 2),
+                (cx, cy - 8), (cx + 8, cy - 2)
+            ])
+        return self._finish(key, surface, (cx, cy))
+
+    def player(self, shield: bool):
+        key = ('player', shield)
+        if key in self.sprites:
+            return self.sprites[key]
+        # Sized to fit the shield ring (radius = ship width)
+        surface = pygame.Surface((81, 81), pygame.SRCALPHA)
+        cx = cy = 40
+        points = [(cx, cy - 15), (cx - 20, cy + 15), (cx + 20, cy + 15)]
+        pygame.draw.polygon(surface, GREEN, points)
+        pygame.draw.polygon(surface, WHITE, points, 2)
+        # Cockpit
+        pygame.draw.circle(surface, CYAN, (cx, cy), 8)
+        if shield:
+            pygame.draw.circle(surface, (100, 200, 255), (cx, cy), 40, 2)
+        return self._finish(key, surface, (cx, cy))
+
+    def enemy_plain(self, color: tuple):
+        """Opaque, eyeless enemy body for the lowest quality level."""
+        key = ('enemy_plain', color)
+        if key in self.sprites:
+            return self.sprites[key]
+        surface = pygame.Surface((self.size(30), self.size(25)))
+        surface.fill(color)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        self.sprites[key] = (surface, (int(15 * self.scale), int(12 * self.scale)))
+        return self.sprites[key]
+
+    def bullet(self, color: tuple, radius: int, glow: bool = True):
+        """Bullet body plus inner glow, colorkeyed for fast RLE blits."""
+        key = ('bullet', color, radius, glow)
+        if key in self.sprites:
+            return self.sprites[key]
+        # Drawn at the scaled radius rather than resampled, so they stay crisp
+        scaled = self.size(radius)
+        size = scaled * 2 + 1
+        surface = pygame.Surface((size, size))
+        pygame.draw.circle(surface, color, (scaled, scaled), scaled)
+        # Inner glow
+        if glow and radius > 2:
+            pygame.draw.circle(surface, WHITE, (scaled, scaled), scaled // 2)
+        surface.set_colorkey(BLACK, pygame.RLEACCEL)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        self.sprites[key] = (surface, (scaled, scaled))
+        return self.sprites[key]
+
+    def blit(self, screen, sprite, x: float, y: float):
+        surface, (cx, cy) = sprite
+        screen.blit(surface, (int(x * self.scale) - cx, int(y * self.scale) - cy))
+
+
+SPRITES = SpriteCache()
+
+
+class ParticleSystem:
+    """Fixed-capacity particle pool for visual effects.
+
+    Particles live in a preallocated ring buffer of NumPy arrays. New bursts
+    overwrite the oldest slots once the buffer is full, so memory and frame
+    time stay bounded no matter how many explosions land in one tick.
+    Particles are purely cosmetic and draw from their own RNG, so they never
+    disturb gameplay randomness.
+    """
+    def __init__(self, capacity: int = MAX_PARTICLES, seed: Optional[int] = None):
+        self.capacity = capacity
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.prev_x = np.zeros(capacity)
+        self.prev_y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.lifetime = np.zeros(capacity, dtype=np.int32)
+        self.max_lifetime = np.ones(capacity, dtype=np.int32)
+        self.color = np.zeros(capacity, dtype=np.uint8)
+        self.palette: List[tuple] = []
+        self.palette_index = {}
+        self.head = 0
+        self.reseed(seed)
+        # Pixel offsets for each particle size, taken from pygame's own circles;
+        # sizes above 4 are for render scales above 1
+        self.stamps = {}
+        for size in range(1, 9):
+            stamp = pygame.Surface((size * 2 + 1, size * 2 + 1))
+            pygame.draw.circle(stamp, WHITE, (size, size), size)
+            xs, ys = np.nonzero(pygame.surfarray.array2d(stamp))
+            self.stamps[size] = (xs - size, ys - size)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.lifetime > 0))
+
+    def clear(self):
+        self.lifetime[:] = 0
+        self.head = 0
+
+    def reseed(self, seed: Optional[int]):
+        """Restart the particle RNG; negative seeds are folded into NumPy's unsigned range."""
+        self.rng = np.random.default_rng(None if seed is None else seed & 0xFFFFFFFFFFFFFFFF)
+
+    # head, palette size, live count; then the PCG64 state as two 128-bit halves
+    HEADER = struct.Struct('<IBI4QiI')
+    ARRAYS = ('x', 'y', 'prev_x', 'prev_y', 'vx', 'vy', 'lifetime', 'max_lifetime', 'color')
+
+    def pack(self) -> bytes:
+        """Serialize the live particles (by slot), palette and RNG state."""
+        live = np.flatnonzero(self.lifetime > 0).astype(np.uint32)
+        rng = self.rng.bit_generator.state
+        state, inc = rng['state']['state'], rng['state']['inc']
+        parts = [self.HEADER.pack(self.head, len(self.palette), live.size,
+                                  state >> 64, state & (2 ** 64 - 1), inc >> 64, inc & (2 ** 64 - 1),
+                                  rng['has_uint32'], rng['uinteger']),
+                 bytes(c for color in self.palette for c in color), live.tobytes()]
+        parts.extend(getattr(self, name)[live].tobytes() for name in self.ARRAYS)
+        return b''.join(parts)
+
+    def unpack(self, data, offset: int) -> int:
+        """Restore state written by pack(); returns the offset past it."""
+        (self.head, colors, count, state_hi, state_lo, inc_hi, inc_lo,
+         has_uint32, uinteger) = self.HEADER.unpack_from(data, offset)
+        offset += self.HEADER.size
+        self.palette = [tuple(data[offset + i:offset + i + 3]) for i in range(0, colors * 3, 3)]
+        self.palette_index = {color: i for i, color in enumerate(self.palette)}
+        offset += colors * 3
+        self.rng.bit_generator.state = {
+            'bit_generator': 'PCG64',
+            'state': {'state': (state_hi << 64) | state_lo, 'inc': (inc_hi << 64) | inc_lo},
+            'has_uint32': has_uint32, 'uinteger': uinteger,
+        }
+        live = np.frombuffer(data, np.uint32, count, offset)
+        offset += live.nbytes
+        self.lifetime[:] = 0
+        for name in self.ARRAYS:
+            array = getattr(self, name)
+            values = np.frombuffer(data, array.dtype, count, offset)
+            array[live] = values
+            offset += values.nbytes
+        return offset
+
+    def emit(self, xs, ys, color: tuple, count: int):
+        """Spawn count particles at each (x, y) origin in one vectorized write."""
+        origins = np.size(xs)
+        total = min(origins * count, self.capacity)
+        if total <= 0:
+            return
+        angle = self.rng.uniform(0, 2 * math.pi, total)
+        speed = self.rng.uniform(2, 6, total)
+        lifetime = self.rng.integers(20, 41, total)
+        slots = (self.head + np.arange(total)) % self.capacity
+        # Only the newest bursts survive when a batch exceeds capacity
+        self.x[slots] = np.repeat(np.asarray(xs, dtype=np.float64), count)[-total:]
+        self.y[slots] = np.repeat(np.asarray(ys, dtype=np.float64), count)[-total:]
+        self.prev_x[slots] = self.x[slots]
+        self.prev_y[slots] = self.y[slots]
+        self.vx[slots] = np.cos(angle) * speed
+        self.vy[slots] = np.sin(angle) * speed
+        self.lifetime[slots] = lifetime
+        self.max_lifetime[slots] = lifetime
+        index = self.palette_index.get(color)
+        if index is None:
+            index = self.palette_index[color] = len(self.palette)
+            self.palette.append(color)
+        self.color[slots] = index
+        self.head = (self.head + total) % self.capacity
+
+    def update(self):
+        live = self.lifetime > 0
+        np.copyto(self.prev_x, self.x)
+        np.copyto(self.prev_y, self.y)
+        self.x += self.vx
+        self.y += self.vy
+        self.lifetime -= live
+
+    def draw(self, screen, alpha: float = 1.0):
+        """Write every live particle straight into the screen's pixel array."""
+        live = np.flatnonzero(self.lifetime > 0)
+        if not live.size:
+            return
+        size = np.maximum(1, (4 * self.lifetime[live] // self.max_lifetime[live]))
+        px = lerp(self.prev_x[live], self.x[live], alpha)
+        py = lerp(self.prev_y[live], self.y[live], alpha)
+        scale = SPRITES.scale
+        if scale != 1.0:
+            px = px * scale
+            py = py * scale
+            size = np.clip((size * scale + 0.5).astype(np.int32), 1, max(self.stamps))
+        px = px.astype(np.int64)
+        py = py.astype(np.int64)
+        mapped = np.array([screen.map_rgb(color) for color in self.palette], dtype=np.uint32)
+        colors = mapped[self.color[live]]
+        width, height = screen.get_size()
+        pixels = pygame.surfarray.pixels2d(screen)
+        for radius, (ox, oy) in self.stamps.items():
+            chosen = size == radius
+            if not chosen.any():
+                continue
+            xs = (px[chosen, None] + ox).ravel()
+            ys = (py[chosen, None] + oy).ravel()
+            values = np.repeat(colors[chosen], len(ox))
+            inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+            pixels[xs[inside], ys[inside]] = values[inside]
+        del pixels
 
 
 class Bullet:
-    """Base bullet class for both player and enemy projectiles."""
+    """Spawn record for a player or enemy projectile.
+
+    Live bullets are stored in a BulletStore; these records are only what the
+    shooting code hands over before the store packs them into its arrays.
+    Records are recycled: acquire() takes one from a free list and the store
+    releases the batch back once it has been packed.
+    """
+    __slots__ = ('x', 'y', 'velocity', 'color', 'radius', 'damage', 'is_player')
+    free: List['Bullet'] = []
+
     def __init__(self, x: float, y: float, velocity: Vector2, color: tuple,
                  radius: int = 4, damage: int = 1, is_player: bool = True):
         self.x = x
@@ -89,84 +419,578 @@ class Bullet:
         self.damage = damage
         self.is_player = is_player
 
-    def update(self):
-        self.x += self.velocity.x
-        self.y += self.velocity.y
-        # Check if bullet is off screen
-        return (0 < self.x < SCREEN_WIDTH and 0 < self.y < SCREEN_HEIGHT)
+    @classmethod
+    def acquire(cls, x: float, y: float, vx: float, vy: float, color: tuple,
+                radius: int = 4, damage: int = 1, is_player: bool = True) -> 'Bullet':
+        if not cls.free:
+            return cls(x, y, Vector2(vx, vy), color, radius, damage, is_player)
+        bullet = cls.free.pop()
+        bullet.x = x
+        bullet.y = y
+        bullet.velocity.x = vx
+        bullet.velocity.y = vy
+        bullet.color = color
+        bullet.radius = radius
+        bullet.damage = damage
+        bullet.is_player = is_player
+        return bullet
+
+    @classmethod
+    def release(cls, bullets: List['Bullet']):
+        cls.free.extend(bullets)
+
+
+class EntityStore:
+    """Dense struct-of-arrays storage for one kind of entity.
+
+    Every component listed in FIELDS is a NumPy array, and the live entities
+    are the prefix [:count] of each, kept in spawn order (the order hits,
+    shots and RNG draws happen in). Each entity gets a handle, its spawn
+    serial number in `id`. Handles are never reused, and removal keeps spawn
+    order, so the live handles are always sorted and find() is a binary
+    search.
+
+    Removals during a tick go through destroy(), which only marks the
+    entity; flush() then drops every marked entity in one vectorized pass at
+    the end of the tick. Entity counts are len(store), never kept by hand.
+    """
+    FIELDS: Tuple[Tuple[str, object], ...] = ()
+
+    def __init__(self, capacity: int):
+        self.count = 0
+        self.next_id = 0
+        self.queued = False  # Whether destroy() marked anything since flush()
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int):
+        old = self.count
+        for name, dtype in self.FIELDS + (('doomed', np.bool_),):
+            array = np.zeros(capacity, dtype=dtype)
+            if old:
+                array[:old] = getattr(self, name)[:old]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+        self.queued = False
+
+    def _spawn(self, n: int) -> slice:
+        """Append n entities with fresh handles; returns their slice to fill in."""
+        start = self.count
+        end = start + n
+        if end > self.capacity:
+            self._allocate(max(end, self.capacity * 2))
+        self.id[start:end] = np.arange(self.next_id, self.next_id + n)
+        self.next_id += n
+        self.doomed[start:end] = False
+        self.count = end
+        return slice(start, end)
+
+    def _compact(self, keep: np.ndarray):
+        """Keep only the live entities selected by keep, preserving order."""
+        n = self.count
+        kept = int(np.count_nonzero(keep))
+        if kept == n:
+            return
+        for name, _ in self.FIELDS + (('doomed', None),):
+            array = getattr(self, name)
+            array[:kept] = array[:n][keep]
+        self.count = kept
+
+    def find(self, handles) -> np.ndarray:
+        """Live indices of the given handles, -1 where the entity is gone."""
+        ids = self.id[:self.count]
+        handles = np.asarray(handles, dtype=ids.dtype)
+        indices = np.searchsorted(ids, handles)
+        found = indices < len(ids)
+        found[found] = ids[indices[found]] == handles[found]
+        return np.where(found, indices, -1)
+
+    def destroy(self, indices):
+        """Queue the entities at the given live indices for the next flush()."""
+        self.doomed[indices] = True
+        self.queued = True
+
+    def flush(self):
+        """Drop every entity queued by destroy() in one pass."""
+        if self.queued:
+            self._compact(~self.doomed[:self.count])
+            self.queued = False
+
+    def pack(self) -> bytes:
+        """Serialize the live entities (object columns are derived, not stored)."""
+        n = self.count
+        parts = [struct.pack('<II', n, self.next_id)]
+        parts.extend(getattr(self, name)[:n].tobytes() for name, dtype in self.FIELDS if dtype is not object)
+        return b''.join(parts)
+
+    def unpack(self, data, offset: int) -> int:
+        """Restore state written by pack(); returns the offset past it."""
+        n, next_id = struct.unpack_from('<II', data, offset)
+        offset += 8
+        if n > self.capacity:
+            self.count = 0
+            self._allocate(n)
+        for name, dtype in self.FIELDS:
+            if dtype is object:
+                continue
+            values = np.frombuffer(data, dtype, n, offset)
+            getattr(self, name)[:n] = values
+            offset += values.nbytes
+        self.count = n
+        self.doomed[:n] = False
+        self.queued = False
+        self.next_id = next_id
+        return offset
+
+
+class BulletStore(EntityStore):
+    """Struct-of-arrays storage for every live bullet.
+
+    Positions, velocities, radius, damage, palette color index and the
+    player/enemy flag are components of an EntityStore. Integration,
+    off-screen culling and bulk removal are single vectorized passes over
+    the live prefix of each array. Each bullet also carries its cached
+    sprite and blit position, so the whole set draws in one blits call. A
+    store that is never drawn (drawn=False) skips the sprites altogether.
+    """
+    FIELDS = (('x', np.float64), ('y', np.float64), ('vx', np.float64), ('vy', np.float64),
+              ('prev_x', np.float64), ('prev_y', np.float64),
+              ('radius', np.int32), ('damage', np.int32), ('color', np.uint8),
+              ('is_player', np.bool_), ('id', np.uint32), ('sprite', object))
+
+    def __init__(self, capacity: int = 512, drawn: bool = True):
+        self.palette: List[tuple] = []
+        self.palette_index = {}
+        self.sprite_table = {}
+        self.glow = True
+        self.drawn = drawn
+        super().__init__(capacity)
+
+    def _allocate(self, capacity: int):
+        super()._allocate(capacity)
+        # Scratch blit positions, rewritten every draw
+        self.dest = np.zeros((capacity, 2), dtype=np.int32)
+
+    def color_id(self, color: tuple) -> int:
+        """Return the palette index for color, registering it on first use."""
+        index = self.palette_index.get(color)
+        if index is None:
+            index = len(self.palette)
+            self.palette.append(color)
+            self.palette_index[color] = index
+        return index
+
+    def extend(self, bullets: List[Bullet]):
+        """Pack a batch of spawn records into the arrays in one go.
+
+        The records are returned to Bullet's free list, so callers must not
+        keep using them afterwards.
+        """
+        if not bullets:
+            return
+        new = self._spawn(len(bullets))
+        self.x[new] = [b.x for b in bullets]
+        self.y[new] = [b.y for b in bullets]
+        self.prev_x[new] = self.x[new]
+        self.prev_y[new] = self.y[new]
+        self.vx[new] = [b.velocity.x for b in bullets]
+        self.vy[new] = [b.velocity.y for b in bullets]
+        self.radius[new] = [b.radius for b in bullets]
+        self.damage[new] = [b.damage for b in bullets]
+        self.color[new] = [self.color_id(b.color) for b in bullets]
+        self.is_player[new] = [b.is_player for b in bullets]
+        self.sprite[new] = [self.sprite_for(b.color, b.radius) for b in bullets]
+        Bullet.release(bullets)
+
+    def add(self, x, y, vx, vy, color, radius, sprite, damage: int = 1, is_player: bool = False):
+        """Append a batch of bullets given as arrays, one entry per bullet.
+
+        color holds palette indices from color_id() and sprite the matching
+        sprite_for() surfaces.
+        """
+        if not len(x):
+            return
+        new = self._spawn(len(x))
+        self.x[new] = x
+        self.y[new] = y
+        self.prev_x[new] = x
+        self.prev_y[new] = y
+        self.vx[new] = vx
+        self.vy[new] = vy
+        self.radius[new] = radius
+        self.damage[new] = damage
+        self.color[new] = color
+        self.is_player[new] = is_player
+        self.sprite[new] = sprite
+
+    def sprite_for(self, color: tuple, radius: int) -> Optional[pygame.Surface]:
+        if not self.drawn:
+            return None
+        key = (color, radius, self.glow)
+        sprite = self.sprite_table.get(key)
+        if sprite is None:
+            sprite = self.sprite_table[key] = SPRITES.bullet(color, radius, self.glow)[0]
+        return sprite
+
+    def set_glow(self, glow: bool):
+        """Switch bullet sprites with and without the inner glow."""
+        if glow != self.glow:
+            self.glow = glow
+            self.refresh_sprites()
+
+    def refresh_sprites(self):
+        """Re-derive every live bullet's sprite from its color and radius."""
+        n = self.count
+        if n:
+            # Look each (color, radius) pair up once
+            keys = self.color[:n].astype(np.int64) * 256 + self.radius[:n]
+            unique, inverse = np.unique(keys, return_inverse=True)
+            sprites = np.empty(len(unique), dtype=object)
+            sprites[:] = [self.sprite_for(self.palette[key // 256], int(key % 256)) for key in unique.tolist()]
+            self.sprite[:n] = sprites[inverse]
 
-    def draw(self, screen):
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius)
-        # Inner glow
-        if self.radius > 2:
-            pygame.draw.circle(screen, WHITE, (int(self.x), int(self.y)), self.radius // 2)
+    def update(self):
+        """Move every bullet and drop the ones that left the screen."""
+        n = self.count
+        x = self.x[:n]
+        y = self.y[:n]
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+        x += self.vx[:n]
+        y += self.vy[:n]
+        self._compact((x > 0) & (x < SCREEN_WIDTH) & (y > 0) & (y < SCREEN_HEIGHT))
+
+    def pack(self) -> bytes:
+        """Serialize the palette, then the live bullets."""
+        return (bytes((len(self.palette),)) + bytes(c for color in self.palette for c in color)
+                + super().pack())
+
+    def unpack(self, data, offset: int) -> int:
+        colors = data[offset]
+        offset += 1
+        self.palette = [tuple(data[offset + i:offset + i + 3]) for i in range(0, colors * 3, 3)]
+        self.palette_index = {color: i for i, color in enumerate(self.palette)}
+        offset = super().unpack(data, offset + colors * 3)
+        # Sprites follow from (color, radius)
+        self.refresh_sprites()
+        return offset
+
+    def clear_enemy_bullets(self):
+        """Remove every enemy bullet; returns their (x, y) positions in order."""
+        n = self.count
+        hostile = ~self.is_player[:n]
+        xs = self.x[:n][hostile]
+        ys = self.y[:n][hostile]
+        self._compact(~hostile)
+        return xs, ys
+
+    def rects(self):
+        """Integer hitbox arrays (left, top, size), truncated like pygame.Rect."""
+        n = self.count
+        radius = self.radius[:n]
+        left = np.trunc(self.x[:n] - radius).astype(np.int64)
+        top = np.trunc(self.y[:n] - radius).astype(np.int64)
+        return left, top, radius * 2
+
+    def draw(self, screen, alpha: float = 1.0):
+        """Blit every bullet sprite in a single Surface.blits call."""
+        n = self.count
+        if not n:
+            return
+        dest = self.dest[:n]
+        x = self.x[:n]
+        y = self.y[:n]
+        if alpha != 1.0:
+            x = lerp(self.prev_x[:n], x, alpha)
+            y = lerp(self.prev_y[:n], y, alpha)
+        radius = self.radius[:n]
+        scale = SPRITES.scale
+        if scale != 1.0:
+            x = x * scale
+            y = y * scale
+            # Sprite centers, as SpriteCache.size() rounds them
+            radius = np.maximum(1, (radius * scale + 0.5).astype(radius.dtype))
+        # Same rounding as drawing a circle at (int(x), int(y))
+        np.copyto(dest[:, 0], x, casting='unsafe')
+        np.copyto(dest[:, 1], y, casting='unsafe')
+        dest -= radius[:, None]
+        screen.blits(zip(self.sprite[:n], dest), doreturn=False)
+
+
+class BulletPattern:
+    """One volley shape, described as data.
+
+    Bullet i flies at angle start + i * spacing degrees (0 = right, 90 = straight
+    down) at the given speed. The velocity table is computed once; emit() turns
+    it into a batch of spawn records, optionally rotated by a (cos, sin) unit
+    vector, so firing needs no trig. spread_x spaces the spawn points out
+    horizontally around the origin, and jitter adds a random sideways speed.
+    """
+    # Unit vectors for whole-degree rotations
+    TURNS = [(math.cos(math.radians(d)), math.sin(math.radians(d))) for d in range(360)]
+
+    def __init__(self, count: int, spacing: float, speed: float, color: tuple, radius: int,
+                 start: float = 90.0, spread_x: float = 0.0, jitter: float = 0.0):
+        self.count = count
+        self.color = color
+        self.radius = radius
+        self.jitter = jitter
+        self.velocities = []
+        for i in range(count):
+            rad = math.radians(start + i * spacing)
+            # Snap float dust so axis-aligned shots stay exactly axis-aligned
+            vx = math.cos(rad) * speed
+            vy = math.sin(rad) * speed
+            self.velocities.append((0.0 if abs(vx) < 1e-9 else vx, 0.0 if abs(vy) < 1e-9 else vy))
+        self.offsets = [(i - (count - 1) / 2) * spread_x for i in range(count)]
+
+    @classmethod
+    def turn(cls, degrees: int) -> Tuple[float, float]:
+        return cls.TURNS[degrees % 360]
+
+    def emit(self, x: float, y: float, rotation: Optional[Tuple[float, float]] = None,
+             rng=random, damage: int = 1, is_player: bool = False) -> List[Bullet]:
+        color = self.color
+        radius = self.radius
+        velocities = self.velocities
+        if rotation is not None:
+            c, s = rotation
+            velocities = [(c * vx - s * vy, s * vx + c * vy) for vx, vy in velocities]
+        if self.jitter:
+            jitter = self.jitter
+            velocities = [(vx + rng.uniform(-jitter, jitter), vy) for vx, vy in velocities]
+        return [Bullet.acquire(x + offset, y, vx, vy, color, radius, damage, is_player)
+                for offset, (vx, vy) in zip(self.offsets, velocities)]
+
+
+class BossAttack:
+    """A named boss attack: one BulletPattern per boss phase.
+
+    orient, if given, is called with (boss, player_x) when the attack fires and
+    returns the (cos, sin) rotation to apply to the volley.
+    """
+    def __init__(self, name: str, patterns: List[BulletPattern],
+                 orient: Optional[Callable[['Boss', float], Tuple[float, float]]] = None):
+        self.name = name
+        self.patterns = patterns
+        self.orient = orient
+
+    def fire(self, boss: 'Boss', player_x: float) -> List[Bullet]:
+        rotation = self.orient(boss, player_x) if self.orient else None
+        return self.patterns[boss.phase].emit(boss.x, boss.y + boss.height // 2, rotation, boss.rng)
+
+
+# Boss attacks in the order the boss cycles through them
+BOSS_ATTACKS: List[BossAttack] = []
+
+
+def register_boss_attack(attack: BossAttack):
+    BOSS_ATTACKS.append(attack)
+
+
+def aim_spread(boss: 'Boss', player_x: float) -> Tuple[float, float]:
+    # Same heading as the original atan2(400, dx) aim, as a unit vector
+    dx = player_x - boss.x
+    length = math.hypot(dx, 400)
+    return 400 / length, dx / length
+
+
+register_boss_attack(BossAttack('circular_burst', [
+    BulletPattern(12 + phase * 4, 360 / (12 + phase * 4), 4 + phase, RED, 6, start=0)
+    for phase in range(3)]))
+register_boss_attack(BossAttack('aimed_spread', [
+    BulletPattern(5 + phase * 2, -(15 + phase * 5), 5 + phase, ORANGE, 5,
+                  start=(2 + phase) * (15 + phase * 5))
+    for phase in range(3)], orient=aim_spread))
+register_boss_attack(BossAttack('spiral', [
+    BulletPattern(4 + phase * 2, 360 / (4 + phase * 2), 3 + phase, PURPLE, 5, start=0)
+    for phase in range(3)], orient=lambda boss, player_x: BulletPattern.turn(boss.move_timer * 10)))
+register_boss_attack(BossAttack('rain', [
+    BulletPattern(5 + phase * 2, 0, 4 + phase, YELLOW, 4, spread_x=20, jitter=1)
+    for phase in range(3)]))
+
+PLAYER_SPREAD = BulletPattern(5, 15, 12, CYAN, 5, start=-120)
+ENEMY_SPREAD = BulletPattern(3, 20, 5, PURPLE, 5, start=70)
+
+
+class Scheduler:
+    """Tick clock plus a heap of events waiting for their deadline.
+
+    Timers are not counted down: their owner stores the tick they run out
+    at and reads what is left with remaining(). Anything that has to happen
+    at a deadline is scheduled as a (deadline, key) event, and advance()
+    pops only the events due that tick, so a tick costs nothing per idle
+    timer and O(log n) per event fired. Owners ignore stale events (a dead
+    enemy's next volley) when they come due.
+    """
+    def __init__(self, now: int = 0, events=()):
+        self.now = now
+        # Sorted, so already a valid heap
+        self.events: List[Tuple[int, int]] = sorted(events)
+
+    def schedule(self, delay: int, key: int) -> int:
+        """Fire key delay ticks from now; returns the deadline."""
+        deadline = self.now + delay
+        heapq.heappush(self.events, (deadline, key))
+        return deadline
+
+    def remaining(self, deadline: int) -> int:
+        """Ticks left until deadline, 0 once it is reached."""
+        return max(0, deadline - self.now)
+
+    def advance(self) -> List[Tuple[int, int]]:
+        """Move the clock on one tick; returns the (deadline, key) events now due."""
+        self.now += 1
+        events = self.events
+        due = []
+        while events and events[0][0] <= self.now:
+            due.append(heapq.heappop(events))
+        return due
+
+
+class Countdown:
+    """Player attribute read as the ticks left until a deadline on player.timers.
+
+    Assigning a number of ticks moves the deadline, so code can keep
+    treating it as a counter that runs down by itself.
+    """
+    def __init__(self, deadline: str):
+        self.deadline = deadline
+
+    def __get__(self, player, owner=None):
+        if player is None:
+            return self
+        return player.timers.remaining(getattr(player, self.deadline))
 
-    def get_rect(self):
-        return pygame.Rect(self.x - self.radius, self.y - self.radius,
-                          self.radius * 2, self.radius * 2)
+    def __set__(self, player, ticks: int):
+        setattr(player, self.deadline, player.timers.now + ticks)
 
 
 class Player:
-    """Player ship with movement, shooting, and power-up handling."""
+    """Player ship with movement, shooting, and power-up handling.
+
+    Cooldowns and power-up durations are deadlines on the player's own
+    Scheduler, which counts its updates; power-ups stay active through the
+    tick their timer reaches 0. Bomb regeneration is a scheduled event
+    that only runs below 5 bombs and keeps its progress while paused.
+    """
+    __slots__ = ('x', 'y', 'prev_x', 'prev_y', 'width', 'height', 'rect', 'speed', 'lives',
+                 'score', 'shoot_delay', 'bombs', 'bomb_regen_delay', 'bomb_regen_progress',
+                 'timers', 'shoot_ready_at', 'invincible_until', 'shield_until', 'rapid_fire_until',
+                 'spread_shot_until', 'bomb_regen_at')
+    BOMB_REGEN = 0  # Scheduler key of the bomb regeneration event
+
+    shoot_cooldown = Countdown('shoot_ready_at')
+    invincible = Countdown('invincible_until')
+    shield_timer = Countdown('shield_until')
+    rapid_fire_timer = Countdown('rapid_fire_until')
+    spread_shot_timer = Countdown('spread_shot_until')
+
     def __init__(self):
         self.reset()
 
     def reset(self):
         self.x = SCREEN_WIDTH // 2
         self.y = SCREEN_HEIGHT - 80
+        self.prev_x = self.x
+        self.prev_y = self.y
         self.width = 40
         self.height = 30
+        self.rect = pygame.Rect(0, 0, self.width, self.height)
         self.speed = 10
         self.lives = 3
         self.score = 0
-        self.shoot_cooldown = 0
+        self.timers = Scheduler()
+        self.shoot_ready_at = 0
         self.shoot_delay = 10
-        self.invincible = 0
-        self.shield_active = False
-        self.shield_timer = 0
-        self.rapid_fire = False
-        self.rapid_fire_timer = 0
-        self.spread_shot = False
-        self.spread_shot_timer = 0
+        self.invincible_until = 0
+        # Power-ups are active up to and including their deadline
+        self.shield_until = -1
+        self.rapid_fire_until = -1
+        self.spread_shot_until = -1
         self.bombs = 5
-        self.bomb_regen_timer = 0
+        self.bomb_regen_at = -1  # No regeneration scheduled
+        self.bomb_regen_progress = 0
         self.bomb_regen_delay = 90  # Regenerate a bomb every 1.5 seconds
 
-    def update(self, keys):
+    @property
+    def shield_active(self) -> bool:
+        return self.timers.now <= self.shield_until
+
+    @property
+    def rapid_fire(self) -> bool:
+        return self.timers.now <= self.rapid_fire_until
+
+    @property
+    def spread_shot(self) -> bool:
+        return self.timers.now <= self.spread_shot_until
+
+    @property
+    def bomb_regen_timer(self) -> int:
+        """Ticks of progress toward the next regenerated bomb."""
+        if self.bomb_regen_at < 0:
+            return self.bomb_regen_progress
+        return self.bomb_regen_delay - (self.bomb_regen_at - self.timers.now)
+
+    STATE = struct.Struct('<4d2hiiqiiiiq6q')
+
+    def pack(self) -> bytes:
+        return self.STATE.pack(
+            self.x, self.y, self.prev_x, self.prev_y, self.width, self.height, self.speed,
+            self.lives, self.score, self.shoot_delay, self.bombs, self.bomb_regen_delay,
+            self.bomb_regen_progress, self.timers.now, self.shoot_ready_at, self.invincible_until,
+            self.shield_until, self.rapid_fire_until, self.spread_shot_until, self.bomb_regen_at)
+
+    @classmethod
+    def unpack(cls, data, offset: int) -> 'Player':
+        player = cls.__new__(cls)
+        (player.x, player.y, player.prev_x, player.prev_y, player.width, player.height,
+         player.speed, player.lives, player.score, player.shoot_delay, player.bombs,
+         player.bomb_regen_delay, player.bomb_regen_progress, now, player.shoot_ready_at,
+         player.invincible_until, player.shield_until, player.rapid_fire_until,
+         player.spread_shot_until, player.bomb_regen_at) = cls.STATE.unpack_from(data, offset)
+        events = [(player.bomb_regen_at, cls.BOMB_REGEN)] if player.bomb_regen_at >= 0 else []
+        player.timers = Scheduler(now, events)
+        player.rect = pygame.Rect(0, 0, player.width, player.height)
+        return player
+
+    def update(self, controls: int):
+        self.prev_x = self.x
+        self.prev_y = self.y
+
         # Movement - full screen access, edge to edge
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+        if controls & Controls.LEFT:
             self.x = max(5, self.x - self.speed)
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+        if controls & Controls.RIGHT:
             self.x = min(SCREEN_WIDTH - 5, self.x + self.speed)
-        if keys[pygame.K_UP] or keys[pygame.K_w]:
+        if controls & Controls.UP:
             self.y = max(5, self.y - self.speed)
-        if keys[pygame.K_DOWN] or keys[pygame.K_s]:
+        if controls & Controls.DOWN:
             self.y = min(SCREEN_HEIGHT - 5, self.y + self.speed)
 
-        # Update cooldowns and timers
-        if self.shoot_cooldown > 0:
-            self.shoot_cooldown -= 1
-        if self.invincible > 0:
-            self.invincible -= 1
-        if self.shield_timer > 0:
-            self.shield_timer -= 1
-        else:
-            self.shield_active = False
-        if self.rapid_fire_timer > 0:
-            self.rapid_fire_timer -= 1
-        else:
-            self.rapid_fire = False
-        if self.spread_shot_timer > 0:
-            self.spread_shot_timer -= 1
-        else:
-            self.spread_shot = False
-
-        # Bomb regeneration
-        if self.bombs < 5:
-            self.bomb_regen_timer += 1
-            if self.bomb_regen_timer >= self.bomb_regen_delay:
+        # Cooldowns and timers run out on their own; only handle due events
+        for deadline, _ in self.timers.advance():
+            # A regeneration paused and resumed since it was scheduled is stale
+            if deadline == self.bomb_regen_at:
                 self.bombs += 1
-                self.bomb_regen_timer = 0
+                self.bomb_regen_at = -1
+                self.bomb_regen_progress = 0
+                self.sync_bomb_regen()
+
+    def sync_bomb_regen(self):
+        """Start or pause bomb regeneration after the bomb count changed."""
+        running = self.bomb_regen_at >= 0
+        if self.bombs < 5 and not running:
+            self.bomb_regen_at = self.timers.schedule(self.bomb_regen_delay - self.bomb_regen_progress,
+                                                      self.BOMB_REGEN)
+        elif self.bombs >= 5 and running:
+            self.bomb_regen_progress = self.bomb_regen_timer
+            self.bomb_regen_at = -1
 
     def shoot(self) -> List[Bullet]:
         """Create bullets based on current power-ups."""
@@ -179,43 +1003,37 @@ class Player:
 
         if self.spread_shot:
             # 5-way spread shot
-            for angle in [-30, -15, 0, 15, 30]:
-                rad = math.radians(angle - 90)
-                vx = math.cos(rad) * 12
-                vy = math.sin(rad) * 12
-                bullets.append(Bullet(self.x, self.y - self.height // 2,
-                                      Vector2(vx, vy), CYAN, 5, 1, True))
+            bullets.extend(PLAYER_SPREAD.emit(self.x, self.y - self.height // 2, is_player=True))
         else:
             # Normal shot
-            bullets.append(Bullet(self.x, self.y - self.height // 2,
-                                 Vector2(0, -12), CYAN, 5, 1, True))
+            bullets.append(Bullet.acquire(self.x, self.y - self.height // 2,
+                                          0, -12, CYAN, 5, 1, True))
             if self.rapid_fire:
                 # Double shot when rapid fire
-                bullets.append(Bullet(self.x - 10, self.y - self.height // 2,
-                                     Vector2(0, -12), CYAN, 4, 1, True))
-                bullets.append(Bullet(self.x + 10, self.y - self.height // 2,
-                                     Vector2(0, -12), CYAN, 4, 1, True))
+                bullets.append(Bullet.acquire(self.x - 10, self.y - self.height // 2,
+                                              0, -12, CYAN, 4, 1, True))
+                bullets.append(Bullet.acquire(self.x + 10, self.y - self.height // 2,
+                                              0, -12, CYAN, 4, 1, True))
 
         return bullets
 
     def use_bomb(self) -> bool:
         if self.bombs > 0:
             self.bombs -= 1
+            self.sync_bomb_regen()
             return True
         return False
 
     def apply_powerup(self, powerup_type: PowerUpType):
         if powerup_type == PowerUpType.RAPID_FIRE:
-            self.rapid_fire = True
             self.rapid_fire_timer = 600  # 10 seconds
         elif powerup_type == PowerUpType.SPREAD_SHOT:
-            self.spread_shot = True
             self.spread_shot_timer = 600
         elif powerup_type == PowerUpType.SHIELD:
-            self.shield_active = True
             self.shield_timer = 480  # 8 seconds
         elif powerup_type == PowerUpType.BOMB:
             self.bombs = min(self.bombs + 1, 5)
+            self.sync_bomb_regen()
         elif powerup_type == PowerUpType.EXTRA_LIFE:
             self.lives = min(self.lives + 1, 5)
 
@@ -227,146 +1045,261 @@ class Player:
         self.invincible = 120  # 2 seconds of invincibility
         return self.lives <= 0
 
-    def draw(self, screen):
+    def draw(self, screen, alpha: float = 1.0):
         # Flicker when invincible
         if self.invincible > 0 and (self.invincible // 5) % 2 == 0:
             return
 
-        # Draw ship body
-        points = [
-            (self.x, self.y - self.height // 2),
-            (self.x - self.width // 2, self.y + self.height // 2),
-            (self.x + self.width // 2, self.y + self.height // 2)
-        ]
-        pygame.draw.polygon(screen, GREEN, points)
-        pygame.draw.polygon(screen, WHITE, points, 2)
-
-        # Draw cockpit
-        pygame.draw.circle(screen, CYAN, (int(self.x), int(self.y)), 8)
-
-        # Draw shield if active
-        if self.shield_active:
-            pygame.draw.circle(screen, (100, 200, 255), (int(self.x), int(self.y)),
-                             self.width, 2)
+        SPRITES.blit(screen, SPRITES.player(self.shield_active),
+                     lerp(self.prev_x, self.x, alpha), lerp(self.prev_y, self.y, alpha))
 
     def get_rect(self):
-        return pygame.Rect(self.x - self.width // 2, self.y - self.height // 2,
-                          self.width, self.height)
+        """Update the persistent hitbox in place and return it."""
+        self.rect.update(self.x - self.width // 2, self.y - self.height // 2,
+                         self.width, self.height)
+        return self.rect
 
 
 class Enemy:
-    """Base enemy class."""
-    def __init__(self, x: float, y: float, enemy_type: int = 0):
+    """Spawn record for one formation member.
+
+    Live enemies are stored in a Formation; spawn_wave builds these records
+    (drawing each first shoot timer from the game RNG) and the formation
+    packs them into its arrays.
+    """
+    __slots__ = ('x', 'y', 'enemy_type', 'health', 'max_health', 'shoot_timer', 'speed', 'points')
+    WIDTH = 30
+    HEIGHT = 25
+    # Colors based on type
+    COLORS = (RED, ORANGE, PURPLE, PINK)
+
+    def __init__(self, x: float, y: float, enemy_type: int = 0, rng=random):
         self.x = x
         self.y = y
         self.enemy_type = enemy_type
-        self.width = 30
-        self.height = 25
         self.health = 1 + enemy_type
         self.max_health = self.health
-        self.shoot_timer = random.randint(30, 120)
-        self.move_timer = 0
-        self.move_direction = 1
+        self.shoot_timer = rng.randint(30, 120)
         self.speed = 1 + enemy_type * 0.5
         self.points = 100 * (1 + enemy_type)
 
-        # Colors based on type
-        self.colors = [RED, ORANGE, PURPLE, PINK]
-        self.color = self.colors[enemy_type % len(self.colors)]
 
-    def update(self, wave: int) -> List[Bullet]:
-        bullets = []
+class Formation(EntityStore):
+    """EntityStore for every enemy of the current wave.
+
+    Movement and descent advance in one vectorized step for the whole wave.
+    Each enemy's next volley is an event on the formation's Scheduler, keyed
+    by the enemy's handle, so a tick only touches the enemies that fire;
+    their volleys are built from per-type templates in one batch, with every
+    type-3 shot aimed at the player at once. Arrays are kept in spawn order,
+    which is also the order shots, hits and RNG draws happen in.
+    """
+    FIELDS = (('x', np.float64), ('y', np.float64), ('prev_x', np.float64), ('prev_y', np.float64),
+              ('enemy_type', np.int8), ('health', np.int32), ('max_health', np.int32),
+              ('next_shot', np.int64), ('move_timer', np.int32), ('move_direction', np.int8),
+              ('speed', np.float64), ('points', np.int32), ('id', np.uint32))
+
+    # Bullets each enemy type fires, as (x offset, vx, vy, color, radius)
+    VOLLEYS = (
+        ((0, 0, 5, YELLOW, 4),),                                  # Simple straight shot
+        ((-8, -1, 5, ORANGE, 4), (8, 1, 5, ORANGE, 4)),          # Double shot
+        tuple((0, vx, vy, ENEMY_SPREAD.color, ENEMY_SPREAD.radius)
+              for vx, vy in ENEMY_SPREAD.velocities),             # Triple spread
+        ((0, 0, 6, PINK, 6),),                                    # Aimed at the player
+    )
+    AIMED_TYPE = 3
+    AIMED_SPEED = 6
+
+    def __init__(self, rng=random, capacity: int = 64):
+        self.rng = rng
+        self.volleys = Scheduler()
+        super().__init__(capacity)
+        # Flattened volley templates, indexed by type through start/size
+        shots = [shot for volley in self.VOLLEYS for shot in volley]
+        self.volley_size = np.array([len(volley) for volley in self.VOLLEYS])
+        self.volley_start = np.cumsum(self.volley_size) - self.volley_size
+        self.shot_dx = np.array([shot[0] for shot in shots], dtype=np.float64)
+        self.shot_vx = np.array([shot[1] for shot in shots], dtype=np.float64)
+        self.shot_vy = np.array([shot[2] for shot in shots], dtype=np.float64)
+        self.shot_style = [(shot[3], shot[4]) for shot in shots]
+        self.shot_radius = np.array([shot[4] for shot in shots], dtype=np.int32)
+        self.shot_aimed = np.zeros(len(shots), dtype=np.bool_)
+        start = self.volley_start[self.AIMED_TYPE]
+        self.shot_aimed[start:start + self.volley_size[self.AIMED_TYPE]] = True
+        self.sprites = np.empty(len(Enemy.COLORS), dtype=object)
+        self.plain_sprites = np.empty(len(Enemy.COLORS), dtype=object)
+
+    def _allocate(self, capacity: int):
+        super()._allocate(capacity)
+        self.dest = np.zeros((capacity, 2), dtype=np.int32)
+
+    def extend(self, enemies: List[Enemy]):
+        """Pack a batch of spawn records into the arrays."""
+        if not enemies:
+            return
+        new = self._spawn(len(enemies))
+        self.x[new] = [e.x for e in enemies]
+        self.y[new] = [e.y for e in enemies]
+        self.prev_x[new] = self.x[new]
+        self.prev_y[new] = self.y[new]
+        self.enemy_type[new] = [e.enemy_type for e in enemies]
+        self.health[new] = [e.health for e in enemies]
+        self.max_health[new] = [e.max_health for e in enemies]
+        self.next_shot[new] = [self.volleys.schedule(e.shoot_timer, handle)
+                               for e, handle in zip(enemies, self.id[new].tolist())]
+        self.move_timer[new] = 0
+        self.move_direction[new] = 1
+        self.speed[new] = [e.speed for e in enemies]
+        self.points[new] = [e.points for e in enemies]
+
+    def color(self, index: int) -> tuple:
+        return Enemy.COLORS[int(self.enemy_type[index]) % len(Enemy.COLORS)]
+
+    def remove_dead(self):
+        self._compact(self.health[:self.count] > 0)
+
+    def remove_off_screen(self):
+        """Drop enemies that descended past the bottom."""
+        self._compact(self.y[:self.count] <= SCREEN_HEIGHT + 50)
+
+    def pack(self) -> bytes:
+        """Serialize the volley clock, then the live enemies."""
+        return struct.pack('<q', self.volleys.now) + super().pack()
+
+    def unpack(self, data, offset: int) -> int:
+        now, = struct.unpack_from('<q', data, offset)
+        offset = super().unpack(data, offset + 8)
+        # One pending volley per live enemy, at its next_shot
+        n = self.count
+        self.volleys = Scheduler(now, zip(self.next_shot[:n].tolist(), self.id[:n].tolist()))
+        return offset
+
+    def hit(self, index: int, damage: int = 1) -> bool:
+        """Returns True if the enemy is destroyed."""
+        self.health[index] -= damage
+        return self.health[index] <= 0
+
+    def rects(self):
+        """Integer hitbox corners (left, top), truncated like pygame.Rect."""
+        n = self.count
+        left = np.trunc(self.x[:n] - Enemy.WIDTH // 2).astype(np.int64)
+        top = np.trunc(self.y[:n] - Enemy.HEIGHT // 2).astype(np.int64)
+        return left, top
+
+    def update(self, wave: int, target_x: float, target_y: float, bullets: 'BulletStore'):
+        """Move the whole formation one tick and fire every volley that is due."""
+        due = self.volleys.advance()
+        n = self.count
+        if not n:
+            return
+        x = self.x[:n]
+        y = self.y[:n]
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
 
         # Movement pattern
-        self.move_timer += 1
-        if self.move_timer > 60:
-            self.move_timer = 0
-            self.move_direction *= -1
-
-        self.x += self.move_direction * self.speed
-        self.y += 0.3 + wave * 0.05  # Descend faster in higher waves
-
-        # Shooting
-        self.shoot_timer -= 1
-        if self.shoot_timer <= 0:
-            self.shoot_timer = random.randint(60 - wave * 2, 150 - wave * 5)
-            self.shoot_timer = max(30, self.shoot_timer)
-            bullets.extend(self.create_bullets(wave))
-
-        return bullets
-
-    def create_bullets(self, wave: int) -> List[Bullet]:
-        bullets = []
-        if self.enemy_type == 0:
-            # Simple straight shot
-            bullets.append(Bullet(self.x, self.y + self.height // 2,
-                                 Vector2(0, 5), YELLOW, 4, 1, False))
-        elif self.enemy_type == 1:
-            # Double shot
-            bullets.append(Bullet(self.x - 8, self.y + self.height // 2,
-                                 Vector2(-1, 5), ORANGE, 4, 1, False))
-            bullets.append(Bullet(self.x + 8, self.y + self.height // 2,
-                                 Vector2(1, 5), ORANGE, 4, 1, False))
-        elif self.enemy_type == 2:
-            # Triple spread
-            for angle in [-20, 0, 20]:
-                rad = math.radians(angle + 90)
-                vx = math.cos(rad) * 5
-                vy = math.sin(rad) * 5
-                bullets.append(Bullet(self.x, self.y + self.height // 2,
-                                     Vector2(vx, vy), PURPLE, 5, 1, False))
-        else:
-            # Aimed shot at player (will be adjusted in game loop)
-            bullets.append(Bullet(self.x, self.y + self.height // 2,
-                                 Vector2(0, 6), PINK, 6, 1, False))
-        return bullets
-
-    def hit(self, damage: int = 1) -> bool:
-        """Returns True if enemy is destroyed."""
-        self.health -= damage
-        return self.health <= 0
-
-    def draw(self, screen):
-        # Draw alien body
-        pygame.draw.rect(screen, self.color,
-                        (self.x - self.width // 2, self.y - self.height // 2,
-                         self.width, self.height), border_radius=5)
-
-        # Draw eyes
-        eye_y = self.y - 3
-        pygame.draw.circle(screen, WHITE, (int(self.x - 7), int(eye_y)), 5)
-        pygame.draw.circle(screen, WHITE, (int(self.x + 7), int(eye_y)), 5)
-        pygame.draw.circle(screen, BLACK, (int(self.x - 7), int(eye_y)), 2)
-        pygame.draw.circle(screen, BLACK, (int(self.x + 7), int(eye_y)), 2)
+        move_timer = self.move_timer[:n]
+        move_timer += 1
+        turn = move_timer > 60
+        move_timer[turn] = 0
+        direction = self.move_direction[:n]
+        direction[turn] *= -1
+        x += direction * self.speed[:n]
+        y += 0.3 + wave * 0.05  # Descend faster in higher waves
+
+        # Shooting: the enemies whose volley is due (events of dead ones find
+        # nothing), with one RNG draw per shooter in formation order
+        if not due:
+            return
+        shooters = self.find([handle for _, handle in due])
+        shooters = np.sort(shooters[shooters >= 0])
+        if shooters.size:
+            randint = self.rng.randint
+            low, high = 60 - wave * 2, 150 - wave * 5
+            self.next_shot[shooters] = [self.volleys.schedule(max(30, randint(low, high)), handle)
+                                        for handle in self.id[shooters].tolist()]
+            self.fire(shooters, target_x, target_y, bullets)
+
+    def fire(self, shooters: np.ndarray, target_x: float, target_y: float, bullets: 'BulletStore'):
+        """Add the volleys of the given enemies to the bullet store, in order."""
+        size = self.volley_size[self.enemy_type[shooters]]
+        owner = np.repeat(shooters, size)
+        # Template index of each bullet: its volley's start plus its place in it
+        first = np.cumsum(size) - size
+        shot = (np.repeat(self.volley_start[self.enemy_type[shooters]] - first, size)
+                + np.arange(owner.size))
+        x = self.x[owner] + self.shot_dx[shot]
+        y = self.y[owner] + Enemy.HEIGHT // 2
+        vx = self.shot_vx[shot]
+        vy = self.shot_vy[shot]
+
+        aimed = np.flatnonzero(self.shot_aimed[shot])
+        if aimed.size:
+            dx = target_x - x[aimed]
+            dy = target_y - y[aimed]
+            dist = np.sqrt(dx * dx + dy * dy)
+            moving = dist > 0
+            aimed = aimed[moving]
+            vx[aimed] = (dx[moving] / dist[moving]) * self.AIMED_SPEED
+            vy[aimed] = (dy[moving] / dist[moving]) * self.AIMED_SPEED
+
+        colors = np.array([bullets.color_id(color) for color, _ in self.shot_style], dtype=np.uint8)
+        sprites = np.empty(len(self.shot_style), dtype=object)
+        sprites[:] = [bullets.sprite_for(color, radius) for color, radius in self.shot_style]
+        bullets.add(x, y, vx, vy, colors[shot], self.shot_radius[shot], sprites[shot])
+
+    def draw(self, screen, alpha: float = 1.0, detailed: bool = True):
+        """Blit every enemy in one blits call, then the health bars.
+
+        With detailed off, enemies are plain opaque blocks without health bars.
+        """
+        n = self.count
+        if not n:
+            return
+        x = lerp(self.prev_x[:n], self.x[:n], alpha)
+        y = lerp(self.prev_y[:n], self.y[:n], alpha)
+        if self.sprites[0] is None:
+            self.sprites[:] = [SPRITES.enemy(color)[0] for color in Enemy.COLORS]
+            self.plain_sprites[:] = [SPRITES.enemy_plain(color)[0] for color in Enemy.COLORS]
+        scale = SPRITES.scale
+        dest = self.dest[:n]
+        np.copyto(dest[:, 0], x * scale if scale != 1.0 else x, casting='unsafe')
+        np.copyto(dest[:, 1], y * scale if scale != 1.0 else y, casting='unsafe')
+        dest -= SPRITES.enemy(Enemy.COLORS[0])[1]
+        table = self.sprites if detailed else self.plain_sprites
+        sprites = table[self.enemy_type[:n] % len(Enemy.COLORS)]
+        screen.blits(zip(sprites, dest), doreturn=False)
+        if not detailed:
+            return
 
         # Health bar for stronger enemies
-        if self.max_health > 1:
-            bar_width = self.width
-            bar_height = 3
-            health_ratio = self.health / self.max_health
-            pygame.draw.rect(screen, RED,
-                           (self.x - bar_width // 2, self.y - self.height // 2 - 8,
-                            bar_width, bar_height))
-            pygame.draw.rect(screen, GREEN,
-                           (self.x - bar_width // 2, self.y - self.height // 2 - 8,
-                            int(bar_width * health_ratio), bar_height))
-
-    def get_rect(self):
-        return pygame.Rect(self.x - self.width // 2, self.y - self.height // 2,
-                          self.width, self.height)
-
-    def is_off_screen(self):
-        return self.y > SCREEN_HEIGHT + 50
+        bar_width = Enemy.WIDTH
+        bar_height = 3
+        for i in np.flatnonzero(self.max_health[:n] > 1).tolist():
+            health_ratio = int(self.health[i]) / int(self.max_health[i])
+            left = (float(x[i]) - bar_width // 2) * scale
+            top = (float(y[i]) - Enemy.HEIGHT // 2 - 8) * scale
+            pygame.draw.rect(screen, RED, (left, top, bar_width * scale, bar_height * scale))
+            pygame.draw.rect(screen, GREEN, (left, top, int(bar_width * health_ratio) * scale,
+                                             bar_height * scale))
 
 
 class Boss:
     """Boss enemy with multiple attack patterns."""
-    def __init__(self, boss_level: int = 1):
+    __slots__ = ('rng', 'x', 'y', 'prev_x', 'prev_y', 'target_y', 'width', 'height', 'rect',
+                 'boss_level', 'health', 'max_health', 'phase', 'attack_timer',
+                 'attack_pattern', 'move_timer', 'move_direction', 'speed', 'entering', 'points')
+
+    def __init__(self, boss_level: int = 1, rng=random):
+        self.rng = rng
         self.x = SCREEN_WIDTH // 2
         self.y = -100
+        self.prev_x = self.x
+        self.prev_y = self.y
         self.target_y = 80
         self.width = 120
         self.height = 80
+        self.rect = pygame.Rect(0, 0, self.width, self.height)
         self.boss_level = boss_level
         self.health = 50 * boss_level
         self.max_health = self.health
@@ -379,8 +1312,30 @@ class Boss:
         self.entering = True
         self.points = 5000 * boss_level
 
+    STATE = struct.Struct('<5d3h2ibiBibd?i')
+
+    def pack(self) -> bytes:
+        return self.STATE.pack(
+            self.x, self.y, self.prev_x, self.prev_y, self.target_y, self.width, self.height,
+            self.boss_level, self.health, self.max_health, self.phase, self.attack_timer,
+            self.attack_pattern, self.move_timer, self.move_direction, self.speed,
+            self.entering, self.points)
+
+    @classmethod
+    def unpack(cls, data, offset: int, rng=random) -> 'Boss':
+        boss = cls.__new__(cls)
+        (boss.x, boss.y, boss.prev_x, boss.prev_y, boss.target_y, boss.width, boss.height,
+         boss.boss_level, boss.health, boss.max_health, boss.phase, boss.attack_timer,
+         boss.attack_pattern, boss.move_timer, boss.move_direction, boss.speed,
+         boss.entering, boss.points) = cls.STATE.unpack_from(data, offset)
+        boss.rng = rng
+        boss.rect = pygame.Rect(0, 0, boss.width, boss.height)
+        return boss
+
     def update(self, player_x: float) -> List[Bullet]:
         bullets = []
+        self.prev_x = self.x
+        self.prev_y = self.y
 
         # Entry animation
         if self.entering:
@@ -410,231 +1365,1541 @@ class Boss:
         # Execute attack patterns
         if self.attack_timer >= 30 - self.phase * 5:
             self.attack_timer = 0
-            self.attack_pattern = (self.attack_pattern + 1) % 4
+            self.attack_pattern = (self.attack_pattern + 1) % len(BOSS_ATTACKS)
             bullets.extend(self.create_attack_pattern(player_x))
 
         return bullets
 
     def create_attack_pattern(self, player_x: float) -> List[Bullet]:
-        bullets = []
-        pattern = self.attack_pattern
-
-        if pattern == 0:
-            # Circular burst
-            num_bullets = 12 + self.phase * 4
-            for i in range(num_bullets):
-                angle = (360 / num_bullets) * i
-                rad = math.radians(angle)
-                speed = 4 + self.phase
-                vx = math.cos(rad) * speed
-                vy = math.sin(rad) * speed
-                bullets.append(Bullet(self.x, self.y + self.height // 2,
-                                     Vector2(vx, vy), RED, 6, 1, False))
-
-        elif pattern == 1:
-            # Aimed spread
-            dx = player_x - self.x
-            angle = math.atan2(400, dx) if dx != 0 else math.pi / 2
-            spread = 15 + self.phase * 5
-            for i in range(-2 - self.phase, 3 + self.phase):
-                rad = angle + math.radians(i * spread)
-                speed = 5 + self.phase
-                vx = math.sin(rad) * speed
-                vy = math.cos(rad) * speed
-                bullets.append(Bullet(self.x, self.y + self.height // 2,
-                                     Vector2(vx, vy), ORANGE, 5, 1, False))
-
-        elif pattern == 2:
-            # Spiral pattern
-            base_angle = self.move_timer * 10
-            for i in range(4 + self.phase * 2):
-                angle = base_angle + i * (360 / (4 + self.phase * 2))
-                rad = math.radians(angle)
-                speed = 3 + self.phase
-                vx = math.cos(rad) * speed
-                vy = math.sin(rad) * speed
-                bullets.append(Bullet(self.x, self.y + self.height // 2,
-                                     Vector2(vx, vy), PURPLE, 5, 1, False))
-
-        else:
-            # Rain pattern
-            for i in range(5 + self.phase * 2):
-                offset = (i - (2 + self.phase)) * 20
-                bullets.append(Bullet(self.x + offset, self.y + self.height // 2,
-                                     Vector2(random.uniform(-1, 1), 4 + self.phase),
-                                     YELLOW, 4, 1, False))
-
-        return bullets
+        return BOSS_ATTACKS[self.attack_pattern].fire(self, player_x)
 
     def hit(self, damage: int = 1) -> bool:
         self.health -= damage
         return self.health <= 0
 
-    def draw(self, screen):
-        if self.entering:
-            pass  # Could add entry effects
-
-        # Main body
-        pygame.draw.rect(screen, PURPLE,
-                        (self.x - self.width // 2, self.y - self.height // 2,
-                         self.width, self.height), border_radius=10)
-        pygame.draw.rect(screen, WHITE,
-                        (self.x - self.width // 2, self.y - self.height // 2,
-                         self.width, self.height), 3, border_radius=10)
-
-        # Core
+    def draw(self, screen, alpha: float = 1.0):
+        x = lerp(self.prev_x, self.x, alpha)
         core_color = RED if self.phase >= 1 else ORANGE
-        pygame.draw.circle(screen, core_color, (int(self.x), int(self.y)), 20)
-        pygame.draw.circle(screen, WHITE, (int(self.x), int(self.y)), 20, 2)
-
-        # Eyes
-        pygame.draw.circle(screen, YELLOW, (int(self.x - 30), int(self.y - 15)), 12)
-        pygame.draw.circle(screen, YELLOW, (int(self.x + 30), int(self.y - 15)), 12)
-        pygame.draw.circle(screen, RED, (int(self.x - 30), int(self.y - 15)), 6)
-        pygame.draw.circle(screen, RED, (int(self.x + 30), int(self.y - 15)), 6)
+        SPRITES.blit(screen, SPRITES.boss(core_color), x, lerp(self.prev_y, self.y, alpha))
 
         # Health bar
         bar_width = self.width + 40
         bar_height = 10
-        bar_x = self.x - bar_width // 2
+        bar_x = x - bar_width // 2
         bar_y = 20
         health_ratio = self.health / self.max_health
+        scale = SPRITES.scale
+        if scale != 1.0:
+            bar_x *= scale
+            bar_y *= scale
+            bar_width *= scale
+            bar_height *= scale
         pygame.draw.rect(screen, (50, 50, 50), (bar_x, bar_y, bar_width, bar_height))
         pygame.draw.rect(screen, RED, (bar_x, bar_y, int(bar_width * health_ratio), bar_height))
         pygame.draw.rect(screen, WHITE, (bar_x, bar_y, bar_width, bar_height), 2)
 
     def get_rect(self):
-        return pygame.Rect(self.x - self.width // 2, self.y - self.height // 2,
-                          self.width, self.height)
+        """Update the persistent hitbox in place and return it."""
+        self.rect.update(self.x - self.width // 2, self.y - self.height // 2,
+                         self.width, self.height)
+        return self.rect
 
 
 class PowerUp:
-    """Collectible power-up item."""
+    """Spawn record for one collectible power-up.
+
+    Live power-ups are stored in a PowerUpStore, which packs these records
+    into its arrays.
+    """
+    __slots__ = ('x', 'y', 'powerup_type')
+    RADIUS = 15
+    SPEED = 2
+    TYPES = tuple(PowerUpType)
+    # Colors for each type
+    COLORS = {
+        PowerUpType.RAPID_FIRE: YELLOW,
+        PowerUpType.SPREAD_SHOT: CYAN,
+        PowerUpType.SHIELD: BLUE,
+        PowerUpType.BOMB: RED,
+        PowerUpType.EXTRA_LIFE: GREEN
+    }
+
     def __init__(self, x: float, y: float, powerup_type: PowerUpType):
         self.x = x
         self.y = y
         self.powerup_type = powerup_type
-        self.radius = 15
-        self.speed = 2
-        self.timer = 0
-
-        # Colors for each type
-        self.colors = {
-            PowerUpType.RAPID_FIRE: YELLOW,
-            PowerUpType.SPREAD_SHOT: CYAN,
-            PowerUpType.SHIELD: BLUE,
-            PowerUpType.BOMB: RED,
-            PowerUpType.EXTRA_LIFE: GREEN
-        }
-        self.color = self.colors[powerup_type]
 
-    def update(self) -> bool:
-        self.y += self.speed
-        self.timer += 1
-        return self.y < SCREEN_HEIGHT + 50
 
-    def draw(self, screen):
-        # Pulsing effect
-        pulse = abs(math.sin(self.timer * 0.1)) * 5
+class PowerUpStore(EntityStore):
+    """EntityStore for the power-ups falling toward the player."""
+    FIELDS = (('x', np.float64), ('y', np.float64), ('prev_y', np.float64), ('speed', np.float64),
+              ('timer', np.int32), ('radius', np.int32), ('kind', np.uint8), ('id', np.uint32))
 
-        pygame.draw.circle(screen, self.color,
-                          (int(self.x), int(self.y)), int(self.radius + pulse))
-        pygame.draw.circle(screen, WHITE,
-                          (int(self.x), int(self.y)), int(self.radius + pulse), 2)
+    def __init__(self, capacity: int = 16):
+        super().__init__(capacity)
 
-        # Icon based on type
-        if self.powerup_type == PowerUpType.RAPID_FIRE:
-            pygame.draw.polygon(screen, WHITE, [
-                (self.x, self.y - 8), (self.x - 6, self.y + 6), (self.x + 6, self.y + 6)
-            ])
-        elif self.powerup_type == PowerUpType.SPREAD_SHOT:
-            for angle in [-30, 0, 30]:
-                rad = math.radians(angle - 90)
-                pygame.draw.line(screen, WHITE, (self.x, self.y),
-                               (self.x + math.cos(rad) * 10, self.y + math.sin(rad) * 10), 2)
-        elif self.powerup_type == PowerUpType.SHIELD:
-            pygame.draw.circle(screen, WHITE, (int(self.x), int(self.y)), 8, 2)
-        elif self.powerup_type == PowerUpType.BOMB:
-            pygame.draw.circle(screen, WHITE, (int(self.x), int(self.y)), 6)
-        elif self.powerup_type == PowerUpType.EXTRA_LIFE:
-            # Heart shape
-            pygame.draw.polygon(screen, WHITE, [
-                (self.x, self.y + 6), (self.x - 8, self.y - 2),
-                (self.x, self.y - 8), (self.x + 8, self.y - 2)
-            ])
+    def extend(self, powerups: List[PowerUp]):
+        """Pack a batch of spawn records into the arrays."""
+        if not powerups:
+            return
+        new = self._spawn(len(powerups))
+        self.x[new] = [p.x for p in powerups]
+        self.y[new] = [p.y for p in powerups]
+        self.prev_y[new] = self.y[new]
+        self.speed[new] = PowerUp.SPEED
+        self.timer[new] = 0
+        self.radius[new] = PowerUp.RADIUS
+        self.kind[new] = [PowerUp.TYPES.index(p.powerup_type) for p in powerups]
+
+    def powerup_type(self, index: int) -> PowerUpType:
+        return PowerUp.TYPES[self.kind[index]]
+
+    def pulse_radius(self, index: int) -> int:
+        """Drawn radius of the pulsing power-up this tick."""
+        return int(self.radius[index] + abs(math.sin(int(self.timer[index]) * 0.1)) * 5)
 
-    def get_rect(self):
-        return pygame.Rect(self.x - self.radius, self.y - self.radius,
-                          self.radius * 2, self.radius * 2)
+    def update(self):
+        """Move every power-up down and drop the ones that fell off the screen."""
+        n = self.count
+        y = self.y[:n]
+        self.prev_y[:n] = y
+        y += self.speed[:n]
+        self.timer[:n] += 1
+        self._compact(y < SCREEN_HEIGHT + 50)
+
+    def rects(self):
+        """Integer hitbox arrays (left, top, size), truncated like pygame.Rect."""
+        n = self.count
+        radius = self.radius[:n]
+        left = np.trunc(self.x[:n] - radius).astype(np.int64)
+        top = np.trunc(self.y[:n] - radius).astype(np.int64)
+        return left, top, radius * 2
+
+    def draw(self, screen, alpha: float = 1.0):
+        for i in range(self.count):
+            powerup_type = self.powerup_type(i)
+            sprite = SPRITES.powerup(powerup_type, PowerUp.COLORS[powerup_type], self.pulse_radius(i))
+            SPRITES.blit(screen, sprite, self.x[i], lerp(self.prev_y[i], self.y[i], alpha))
+
+
+# Mersenne Twister state: 624 words plus position, then the cached gauss value
+RANDOM_STATE = struct.Struct('<625I?d')
+
+
+def pack_random(rng: random.Random) -> bytes:
+    version, words, gauss_next = rng.getstate()
+    return RANDOM_STATE.pack(*words, gauss_next is not None, gauss_next or 0.0)
+
+
+def unpack_random(rng: random.Random, data, offset: int) -> int:
+    """Load state written by pack_random() into rng; returns the offset past it."""
+    *words, has_gauss, gauss_next = RANDOM_STATE.unpack_from(data, offset)
+    rng.setstate((3, tuple(words), gauss_next if has_gauss else None))
+    return offset + RANDOM_STATE.size
+
+
+def fold_seed(seed: Optional[int]) -> Optional[int]:
+    """Wrap a seed into int64, the width replays and the score database store.
+
+    Seeds already in range are returned unchanged.
+    """
+    if seed is None:
+        return None
+    return ((seed + 2 ** 63) & (2 ** 64 - 1)) - 2 ** 63
+
+
+class SpatialHash:
+    """Uniform-grid broadphase for batches of rects.
+
+    build() buckets every rect under each cell it overlaps, as one array of
+    (cell, key) entries sorted by cell, where a rect's key is its index.
+    query() looks a whole batch of rects up with searchsorted, keeps only
+    the pairs that really overlap and returns them ordered by query row and
+    then key, so callers keep the first-match semantics of a plain scan in
+    insertion order.
+    """
+    def __init__(self, cell_size: int = 64):
+        self.cell_size = cell_size
+        self.clear()
+
+    def clear(self):
+        empty = np.zeros(0, dtype=np.int64)
+        self.cells = self.keys = empty
+        self.left = self.top = self.right = self.bottom = empty
+
+    def _cover(self, left, top, right, bottom):
+        """(rect index, cell) for every cell each rect overlaps; empty rects get none."""
+        size = self.cell_size
+        x0 = left // size
+        y0 = top // size
+        columns = (right - 1) // size - x0 + 1
+        rows = (bottom - 1) // size - y0 + 1
+        counts = np.where((right > left) & (bottom > top), columns * rows, 0)
+        owner = np.repeat(np.arange(len(counts)), counts)
+        local = np.arange(owner.size) - np.repeat(np.cumsum(counts) - counts, counts)
+        cx = x0[owner] + local % columns[owner]
+        cy = y0[owner] + local // columns[owner]
+        return owner, (cx << 32) + cy
+
+    def build(self, left, top, width, height):
+        """Replace the contents with the given rects."""
+        self.left = left
+        self.top = top
+        self.right = left + width
+        self.bottom = top + height
+        keys, cells = self._cover(self.left, self.top, self.right, self.bottom)
+        order = np.argsort(cells, kind='stable')
+        self.cells = cells[order]
+        self.keys = keys[order]
+
+    def query(self, left, top, width, height) -> Tuple[np.ndarray, np.ndarray]:
+        """Colliding (row, key) pairs for a batch of rects, by row and then key."""
+        n = len(self.left)
+        if not n:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        right = left + width
+        bottom = top + height
+        rows, cells = self._cover(left, top, right, bottom)
+        spread = rows.size > 1 and bool((rows[1:] == rows[:-1]).any())
+        start = np.searchsorted(self.cells, cells, 'left')
+        counts = np.searchsorted(self.cells, cells, 'right') - start
+        rows = np.repeat(rows, counts)
+        keys = self.keys[np.repeat(start - np.cumsum(counts) + counts, counts) + np.arange(rows.size)]
+        hit = ((left[rows] < self.right[keys]) & (right[rows] > self.left[keys])
+               & (top[rows] < self.bottom[keys]) & (bottom[rows] > self.top[keys]))
+        rows = rows[hit]
+        keys = keys[hit]
+        if spread:
+            # A pair that shares several cells is found once per cell
+            pairs = np.unique(rows * n + keys)
+            return pairs // n, pairs % n
+        # One cell per query rect: pairs are unique and keys already ascend
+        return rows, keys
 
 
 class StarField:
-    """Scrolling star background."""
-    def __init__(self):
-        self.stars = []
-        for _ in range(100):
-            x = random.randint(0, SCREEN_WIDTH)
-            y = random.randint(0, SCREEN_HEIGHT)
-            speed = random.uniform(1, 3)
-            brightness = random.randint(100, 255)
-            self.stars.append([x, y, speed, brightness])
+    """Scrolling parallax star background.
+
+    Stars are rendered once into one screen-sized layer per speed band, so a
+    frame is just two wrapped blits per layer and the star density only
+    affects the time it takes to build the layers. Layers are canvas-sized:
+    scale is the render scale of the canvas they are drawn on.
+    """
+    # (scroll speed, star radius) for star speeds 1-1.5, 1.5-2 and 2-3
+    LAYERS = ((1.25, 1), (1.75, 1), (2.5, 2))
+    STATE = struct.Struct('<II3d')
+
+    def __init__(self, seed: Optional[int] = None, density: int = 100, scale: float = 1.0):
+        # Cosmetic only, so the layers are built from their own 32-bit seed
+        self.seed = seed & 0xFFFFFFFF if seed is not None else random.getrandbits(32)
+        self.density = density
+        self.scale = scale
+        self.scroll = [0.0] * len(self.LAYERS)
+        self.build()
+
+    def build(self):
+        """Render every star into its layer surface."""
+        rng = random.Random(self.seed)
+        scale = self.scale
+        self.layers = []
+        for _ in self.LAYERS:
+            layer = pygame.Surface((int(SCREEN_WIDTH * scale), int(SCREEN_HEIGHT * scale)))
+            layer.set_colorkey(BLACK, pygame.RLEACCEL)
+            self.layers.append(layer)
+        for _ in range(self.density):
+            x = rng.randint(0, SCREEN_WIDTH)
+            y = rng.randint(0, SCREEN_HEIGHT)
+            speed = rng.uniform(1, 3)
+            brightness = rng.randint(100, 255)
+            band = min(int((speed - 1) * 2), 2)
+            radius = self.LAYERS[band][1]
+            if scale != 1.0:
+                x, y, radius = int(x * scale), int(y * scale), max(1, int(radius * scale + 0.5))
+            pygame.draw.circle(self.layers[band], (brightness, brightness, brightness), (x, y), radius)
+        # Match the display format once there is one, for fast blits
+        if pygame.display.get_surface() is not None:
+            self.layers = [layer.convert() for layer in self.layers]
+
+    def pack(self) -> bytes:
+        return self.STATE.pack(self.seed, self.density, *self.scroll)
+
+    def unpack(self, data, offset: int) -> int:
+        seed, density, *scroll = self.STATE.unpack_from(data, offset)
+        self.scroll = scroll
+        if (seed, density) != (self.seed, self.density):
+            self.seed = seed
+            self.density = density
+            self.build()
+        return offset + self.STATE.size
 
     def update(self):
-        for star in self.stars:
-            star[1] += star[2]
-            if star[1] > SCREEN_HEIGHT:
-                star[0] = random.randint(0, SCREEN_WIDTH)
-                star[1] = 0
+        for i, (speed, _) in enumerate(self.LAYERS):
+            self.scroll[i] = (self.scroll[i] + speed) % SCREEN_HEIGHT
+
+    def draw(self, screen, alpha: float = 1.0, full: bool = True):
+        """Blit the layers; without full, only the nearest (brightest) one."""
+        start = 0 if full else len(self.LAYERS) - 1
+        for layer, scroll, (speed, _) in zip(self.layers[start:], self.scroll[start:], self.LAYERS[start:]):
+            # Step back by the part of the tick that has not happened yet
+            y = int((scroll - speed * (1.0 - alpha)) % SCREEN_HEIGHT * self.scale)
+            screen.blit(layer, (0, y))
+            screen.blit(layer, (0, y - layer.get_height()))
+
+
+class KeyboardInput:
+    """Live input source: held keys from pygame plus edge-triggered presses.
+
+    The event loop reports B and P key-downs through press(); they are
+    delivered once, on the next poll. Held keys are read from pygame by
+    sample(), which run() calls on the main thread once per frame, so polls
+    (possibly on a RenderPipeline worker) never touch SDL.
+    """
+    def __init__(self):
+        self.pressed = 0
+        self.held = 0
 
-    def draw(self, screen):
-        for star in self.stars:
-            color = (star[3], star[3], star[3])
-            size = 1 if star[2] < 2 else 2
-            pygame.draw.circle(screen, color, (int(star[0]), int(star[1])), size)
+    def press(self, control: Controls):
+        self.pressed |= control
 
+    def sample(self):
+        """Read the held keys; they are what every poll until the next sample() sees."""
+        keys = pygame.key.get_pressed()
+        held = 0
+        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+            held |= Controls.LEFT
+        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+            held |= Controls.RIGHT
+        if keys[pygame.K_UP] or keys[pygame.K_w]:
+            held |= Controls.UP
+        if keys[pygame.K_DOWN] or keys[pygame.K_s]:
+            held |= Controls.DOWN
+        if keys[pygame.K_SPACE]:
+            held |= Controls.FIRE
+        self.held = held
+
+    def __call__(self, game: 'Game') -> int:
+        controls = self.pressed | self.held
+        self.pressed = 0
+        return controls
+
+
+class ScriptedInput:
+    """Input source that plays back a fixed list of control bitmasks.
+
+    Once the script runs out it either starts over (loop=True) or sends no
+    input at all.
+    """
+    def __init__(self, frames: List[int], loop: bool = False):
+        self.frames = frames
+        self.loop = loop
+        self.position = 0
+
+    def __call__(self, game: 'Game') -> int:
+        if self.position >= len(self.frames):
+            if not self.loop or not self.frames:
+                return 0
+            self.position = 0
+        controls = self.frames[self.position]
+        self.position += 1
+        return controls
+
+
+class ThreatIndex:
+    """Read-only threat queries for bots and tests, built once per tick.
+
+    Hostile bullets and formation enemies are packed into flat arrays of
+    position, per-tick velocity and hitbox half-extents. Every query is a
+    vectorized pass over those arrays, which stays well under a millisecond
+    even with thousands of bullets. Motion is extrapolated in straight lines,
+    so enemy direction flips and newly fired shots are not foreseen.
+    """
+    # Threat count above which impact queries first cull by swept bounding box
+    CULL_ABOVE = 256
+
+    def __init__(self, game: 'Game'):
+        bullets = game.bullets
+        n = bullets.count
+        hostile = ~bullets.is_player[:n]
+        formation = game.formation
+        m = len(formation)
+        descent = 0.3 + game.wave * 0.05
+        self.x = np.concatenate((bullets.x[:n][hostile], formation.x[:m]))
+        self.y = np.concatenate((bullets.y[:n][hostile], formation.y[:m]))
+        self.vx = np.concatenate((bullets.vx[:n][hostile], formation.move_direction[:m] * formation.speed[:m]))
+        self.vy = np.concatenate((bullets.vy[:n][hostile], np.full(m, descent)))
+        radius = bullets.radius[:n][hostile]
+        self.half_w = np.concatenate((radius, np.full(m, Enemy.WIDTH / 2)))
+        self.half_h = np.concatenate((radius, np.full(m, Enemy.HEIGHT / 2)))
+        self.bullet_count = int(np.count_nonzero(hostile))
+        player = game.player
+        self.player_half_w = player.width / 2
+        self.player_half_h = player.height / 2
+
+    def __len__(self):
+        return len(self.x)
+
+    def nearest(self, x: float, y: float, k: int = 8) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices and distances of the k threats closest to (x, y), nearest first."""
+        dist = np.hypot(self.x - x, self.y - y)
+        if k < len(dist):
+            index = np.argpartition(dist, k)[:k]
+        else:
+            index = np.arange(len(dist))
+        index = index[np.argsort(dist[index], kind='stable')]
+        return index, dist[index]
+
+    def impact_times(self, x, y, vx=0.0, vy=0.0, horizon: float = 60, margin: float = 2.0) -> np.ndarray:
+        """Earliest tick at which the player box, moving from (x, y) at
+        (vx, vy) per tick, overlaps any threat; inf if none within horizon.
+
+        Arguments may be arrays (one entry per candidate path) and broadcast
+        against each other; the result has one time per candidate.
+        """
+        x, y, vx, vy = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=np.float64))
+                                             for v in (x, y, vx, vy)))
+        extent_x = self.half_w + self.player_half_w + margin
+        extent_y = self.half_h + self.player_half_h + margin
+        keep = np.ones(len(self.x), dtype=np.bool_)
+        if len(self.x) > self.CULL_ABOVE:
+            # Cull threats whose swept box cannot meet any candidate's within the horizon
+            for pos, vel, tpos, tvel, extent in ((x, vx, self.x, self.vx, extent_x),
+                                                 (y, vy, self.y, self.vy, extent_y)):
+                low = (pos + np.minimum(vel * horizon, 0)).min()
+                high = (pos + np.maximum(vel * horizon, 0)).max()
+                reach = tvel * horizon
+                keep &= ((tpos + np.minimum(reach, 0) - extent < high)
+                         & (tpos + np.maximum(reach, 0) + extent > low))
+        if not keep.any():
+            return np.full(x.shape, np.inf)
+        count = int(np.count_nonzero(keep))
+        enter = np.zeros((len(x), count))
+        leave = np.full((len(x), count), np.inf)
+        # Slab test per axis on the relative motion threat - player
+        for pos, vel, tpos, tvel, extent in ((x, vx, self.x[keep], self.vx[keep], extent_x[keep]),
+                                             (y, vy, self.y[keep], self.vy[keep], extent_y[keep])):
+            gap = tpos[None, :] - pos[:, None]
+            rate = tvel[None, :] - vel[:, None]
+            still = rate == 0
+            with np.errstate(divide='ignore', invalid='ignore'):
+                t1 = (-extent - gap) / rate
+                t2 = (extent - gap) / rate
+            inside = np.abs(gap) < extent
+            t_in = np.where(still, np.where(inside, -np.inf, np.inf), np.minimum(t1, t2))
+            t_out = np.where(still, np.where(inside, np.inf, -np.inf), np.maximum(t1, t2))
+            np.maximum(enter, t_in, out=enter)
+            np.minimum(leave, t_out, out=leave)
+        hit = (enter < leave) & (leave > 0) & (enter <= horizon)
+        times = np.where(hit, np.maximum(enter, 0.0), np.inf)
+        return times.min(axis=1)
+
+    def time_to_impact(self, x: float, y: float, vx: float = 0.0, vy: float = 0.0,
+                       horizon: float = 60) -> float:
+        """Ticks until the player, moving at (vx, vy), is hit; inf if safe."""
+        return float(self.impact_times(x, y, vx, vy, horizon)[0])
+
+    def safe_lanes(self, y: float, horizon: float = 60, lane_width: int = 40) -> np.ndarray:
+        """Ticks until a player parked at height y is hit, per lane_width-wide
+        column across the screen (inf for lanes that stay clear)."""
+        centers = np.arange(lane_width / 2, SCREEN_WIDTH, lane_width)
+        return self.impact_times(centers, y, 0.0, 0.0, horizon)
+
+
+class Autopilot:
+    """Input source that plays the game on its own, for soak tests.
+
+    Every tick it scores the nine ways to move (or not) by how long each path
+    stays clear of threats, fires constantly, and among equally safe moves
+    heads for the lowest enemy (or the boss) while keeping to the bottom of
+    the screen. When every move runs into something within a couple of
+    ticks, it bombs.
+    """
+    MOVES = (0, Controls.LEFT, Controls.RIGHT, Controls.UP, Controls.DOWN,
+             Controls.LEFT | Controls.UP, Controls.LEFT | Controls.DOWN,
+             Controls.RIGHT | Controls.UP, Controls.RIGHT | Controls.DOWN)
+
+    def __init__(self, horizon: int = 40, home_y: float = SCREEN_HEIGHT - 80, top_y: float = 360):
+        self.horizon = horizon
+        self.home_y = home_y
+        self.top_y = top_y
+        self.dx = np.array([(-1 if m & Controls.LEFT else 0) + (1 if m & Controls.RIGHT else 0)
+                            for m in self.MOVES], dtype=np.float64)
+        self.dy = np.array([(-1 if m & Controls.UP else 0) + (1 if m & Controls.DOWN else 0)
+                            for m in self.MOVES], dtype=np.float64)
+
+    def target_x(self, game: 'Game') -> float:
+        if game.boss:
+            return game.boss.x
+        formation = game.formation
+        n = len(formation)
+        if not n:
+            return SCREEN_WIDTH / 2
+        # Lowest enemy first: it is both the closest threat and the easiest shot
+        lowest = int(np.argmax(formation.y[:n]))
+        return float(formation.x[lowest])
+
+    def __call__(self, game: 'Game') -> int:
+        player = game.player
+        speed = player.speed
+        # Moves into a wall go nowhere on that axis
+        vx = self.dx * speed
+        vy = self.dy * speed
+        vx[(vx < 0) & (player.x - speed < 5)] = 0
+        vx[(vx > 0) & (player.x + speed > SCREEN_WIDTH - 5)] = 0
+        vy[(vy < 0) & (player.y - speed < self.top_y)] = 0
+        vy[(vy > 0) & (player.y + speed > SCREEN_HEIGHT - 20)] = 0
+
+        threats = game.threats()
+        clear = np.minimum(threats.impact_times(player.x, player.y, vx, vy, self.horizon),
+                           self.horizon)
+        after_x = player.x + vx
+        after_y = player.y + vy
+        score = (clear * 100.0
+                 - np.abs(after_x - self.target_x(game))
+                 - np.abs(after_y - self.home_y) * 0.5)
+        best = int(np.argmax(score))
+        controls = Controls.FIRE | self.MOVES[best]
+        if (clear[best] < 2 and player.bombs > 0
+                and not player.invincible and not player.shield_active):
+            controls |= Controls.BOMB
+        return int(controls)
+
+
+class Replay:
+    """A recorded game: the seed plus one Controls bitmask per tick.
+
+    On disk the inputs are run-length encoded (mask byte, varint run length)
+    and zlib-compressed behind a small fixed header, which keeps a minute of
+    play well under a few KB.
+    """
+    MAGIC = b'SIRP'
+    VERSION = 1
+    HEADER = struct.Struct('<4sBqI')  # magic, version, seed, tick count
+
+    def __init__(self, seed: int, inputs: Optional[bytearray] = None):
+        if seed != fold_seed(seed):
+            raise ValueError(f"replay seeds must fit in 64 bits (see fold_seed): {seed}")
+        self.seed = seed
+        self.inputs = inputs if inputs is not None else bytearray()
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def record(self, controls: int):
+        self.inputs.append(controls)
+
+    def to_bytes(self) -> bytes:
+        runs = bytearray()
+        inputs = self.inputs
+        i = 0
+        while i < len(inputs):
+            mask = inputs[i]
+            j = i + 1
+            while j < len(inputs) and inputs[j] == mask:
+                j += 1
+            runs.append(mask)
+            run = j - i
+            while run >= 0x80:
+                runs.append((run & 0x7F) | 0x80)
+                run >>= 7
+            runs.append(run)
+            i = j
+        return self.HEADER.pack(self.MAGIC, self.VERSION, self.seed, len(inputs)) + zlib.compress(bytes(runs), 9)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Replay':
+        magic, version, seed, ticks = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError("not a replay file, or an unsupported version")
+        runs = zlib.decompress(data[cls.HEADER.size:])
+        inputs = bytearray()
+        i = 0
+        while i < len(runs):
+            mask = runs[i]
+            i += 1
+            run = shift = 0
+            while True:
+                byte = runs[i]
+                i += 1
+                run |= (byte & 0x7F) << shift
+                shift += 7
+                if byte < 0x80:
+                    break
+            inputs.extend(bytes((mask,)) * run)
+        if len(inputs) != ticks:
+            raise ValueError("replay input stream is truncated")
+        return cls(seed, inputs)
+
+    def save(self, path: str):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> 'Replay':
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+class ReplayPlayer:
+    """Input source that plays a Replay back tick for tick.
+
+    Inputs are looked up by game.ticks, so playback stays frame-exact however
+    the game is stepped. Every KEYFRAME_INTERVAL ticks the game state is kept
+    as a keyframe; seek() restores the nearest one at or before the target
+    and simulates forward from there.
+    """
+    def __init__(self, replay: Replay):
+        self.replay = replay
+        self.keyframes: Dict[int, bytes] = {}
+
+    def __call__(self, game: 'Game') -> int:
+        tick = game.ticks
+        if tick % KEYFRAME_INTERVAL == 0 and tick not in self.keyframes:
+            self.keyframes[tick] = game.snapshot()
+        if tick < len(self.replay.inputs):
+            return self.replay.inputs[tick]
+        return 0
+
+    def seek(self, game: 'Game', tick: int):
+        tick = max(0, min(tick, len(self.replay)))
+        known = [t for t in self.keyframes if t <= tick]
+        if known and (tick < game.ticks or max(known) > game.ticks):
+            game.restore(self.keyframes[max(known)])
+        elif tick < game.ticks:
+            raise ValueError("no keyframe to seek back to")
+        game.step(tick - game.ticks)
+
+
+class SpectatorFeed:
+    """Encodes what is on screen as a stream of keyframes and per-tick deltas.
+
+    Bullets and enemies are tracked by spawn id. A delta lists which of the
+    previous tick's entities are gone (a bit mask), the static attributes
+    and positions of new ones, and for the rest the change in velocity of
+    their positions, quantized to 1/QUANT px. Ids only identify an entity
+    within one Game.timeline: when it moves on (a new game, a restore()),
+    the tracked state is dropped and a keyframe goes to every viewer. Bullets fly in straight lines,
+    so that is almost all zeros and zlib shrinks a full boss barrage to a few
+    hundred bytes. Keyframes carry the complete tracked state, and the HUD,
+    player, boss and power-ups are sent whole every tick; particles are not
+    sent at all.
+    """
+    QUANT = 4
+    MAGIC = b'SISP'
+    VERSION = 1
+    MESSAGE = struct.Struct('<I')  # Length of the zlib payload that follows
+    FRAME = struct.Struct('<B I B h i b b ? h h H ? B')
+    BOSS = struct.Struct('<h h i i B')
+    POWERUP = struct.Struct('<h h B B')
+    KEY, DELTA = 0, 1
+    # Per tracked kind: static attribute count (uint8) and dynamic column count (int16)
+    KINDS = (('bullets', 4), ('enemies', 2))
+    DYNAMIC = {'bullets': 2, 'enemies': 3}
 
-class Game:
-    """Main game class."""
     def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Space Invaders: Bullet Hell Edition")
-        self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 36)
-        self.big_font = pygame.font.Font(None, 72)
-
-        self.state = GameState.MENU
-        self.starfield = StarField()
+        self.reset()
+
+    def reset(self):
+        """Forget the tracked entities; the next encode() sends them all as new."""
+        self.timeline = None
+        self.state = {}
+        for kind, statics in self.KINDS:
+            columns = self.DYNAMIC[kind]
+            self.state[kind] = (np.zeros(0, np.uint32), np.zeros((0, statics), np.uint8),
+                                np.zeros((0, columns), np.int16), np.zeros((0, columns), np.int16))
+
+    @classmethod
+    def capture(cls, game: 'Game') -> dict:
+        """Current (ids, static attributes, quantized dynamic columns) per kind."""
+        q = cls.QUANT
+        bullets = game.bullets
+        n = bullets.count
+        palette = np.array(bullets.palette or [BLACK], dtype=np.uint8)
+        bullet_static = np.empty((n, 4), np.uint8)
+        bullet_static[:, :3] = palette[bullets.color[:n]]
+        bullet_static[:, 3] = bullets.radius[:n]
+        bullet_dynamic = np.empty((n, 2), np.int16)
+        bullet_dynamic[:, 0] = np.round(bullets.x[:n] * q)
+        bullet_dynamic[:, 1] = np.round(bullets.y[:n] * q)
+
+        formation = game.formation
+        m = len(formation)
+        enemy_static = np.empty((m, 2), np.uint8)
+        enemy_static[:, 0] = formation.enemy_type[:m]
+        enemy_static[:, 1] = formation.max_health[:m]
+        enemy_dynamic = np.empty((m, 3), np.int16)
+        enemy_dynamic[:, 0] = np.round(formation.x[:m] * q)
+        enemy_dynamic[:, 1] = np.round(formation.y[:m] * q)
+        enemy_dynamic[:, 2] = formation.health[:m]
+        return {'bullets': (bullets.id[:n], bullet_static, bullet_dynamic),
+                'enemies': (formation.id[:m], enemy_static, enemy_dynamic)}
+
+    def header(self, game: 'Game', kind: int) -> bytes:
+        q = self.QUANT
+        player = game.player
+        boss = game.boss
+        parts = [self.FRAME.pack(kind, game.ticks, game.state.value, game.wave, player.score,
+                                 player.lives, player.bombs, player.shield_active,
+                                 round(player.x * q), round(player.y * q), min(player.invincible, 65535),
+                                 boss is not None, len(game.powerups))]
+        if boss is not None:
+            parts.append(self.BOSS.pack(round(boss.x * q), round(boss.y * q), boss.health,
+                                        boss.max_health, boss.phase))
+        powerups = game.powerups
+        for i in range(len(powerups)):
+            parts.append(self.POWERUP.pack(round(powerups.x[i] * q), round(powerups.y[i] * q),
+                                           powerups.powerup_type(i).value, powerups.pulse_radius(i)))
+        return b''.join(parts)
+
+    def encode(self, game: 'Game', keyframe: bool = False) -> Tuple[bytes, bytes]:
+        """Advance the tracked state to this tick.
+
+        Returns (delta, keyframe) messages; the keyframe is only built (else
+        b'') when asked for, and describes the same state the delta leads to.
+        After a discontinuity both messages are the keyframe.
+        """
+        resync = game.timeline != self.timeline
+        if resync:
+            self.reset()
+            self.timeline = game.timeline
+            keyframe = True
+        current = self.capture(game)
+        delta = [self.header(game, self.DELTA)]
+        for kind, _ in self.KINDS:
+            ids, static, dynamic = current[kind]
+            prev_ids, prev_static, prev_q, prev_d = self.state[kind]
+            keep = np.isin(prev_ids, ids)
+            new = ~np.isin(ids, prev_ids)
+            # Rows of the survivors in the current arrays, in their previous
+            # order; entity handles are always sorted (see EntityStore)
+            rows = np.searchsorted(ids, prev_ids[keep])
+            kept_q = dynamic[rows]
+            kept_d = kept_q - prev_q[keep]
+            new_q = dynamic[new]
+            delta.append(struct.pack('<II', len(prev_ids), int(np.count_nonzero(new))))
+            delta.append(np.packbits(keep).tobytes())
+            delta.append(static[new].tobytes())
+            delta.append(new_q.tobytes())
+            delta.append((kept_d - prev_d[keep]).tobytes())
+            self.state[kind] = (np.concatenate((prev_ids[keep], ids[new])),
+                                np.concatenate((prev_static[keep], static[new])),
+                                np.concatenate((kept_q, new_q)),
+                                np.concatenate((kept_d, np.zeros_like(new_q))))
+        key = b''
+        if keyframe:
+            parts = [self.header(game, self.KEY)]
+            for kind, _ in self.KINDS:
+                _, static, q, d = self.state[kind]
+                parts.extend((struct.pack('<I', len(q)), static.tobytes(), q.tobytes(), d.tobytes()))
+            key = self.message(b''.join(parts))
+        if resync:
+            return key, key
+        return self.message(b''.join(delta)), key
+
+    @classmethod
+    def message(cls, payload: bytes) -> bytes:
+        payload = zlib.compress(payload, 1)
+        return cls.MESSAGE.pack(len(payload)) + payload
+
+
+class SpectatorScene:
+    """Viewer side of SpectatorFeed: rebuilds the scene and draws it."""
+    def __init__(self):
+        self.frames = 0
+        self.header = None
+        self.boss = None
+        self.powerups = []
+        self.kinds = {}
+        for kind, statics in SpectatorFeed.KINDS:
+            columns = SpectatorFeed.DYNAMIC[kind]
+            self.kinds[kind] = (np.zeros((0, statics), np.uint8), np.zeros((0, columns), np.int16),
+                                np.zeros((0, columns), np.int16))
+        self.synced = False  # Deltas are ignored until the first keyframe
+
+    def apply(self, payload: bytes):
+        """Apply one message payload (after the length prefix)."""
+        data = zlib.decompress(payload)
+        feed = SpectatorFeed
+        header = feed.FRAME.unpack_from(data)
+        kind = header[0]
+        if kind == feed.DELTA and not self.synced:
+            return
+        offset = feed.FRAME.size
+        self.boss = None
+        if header[11]:
+            self.boss = feed.BOSS.unpack_from(data, offset)
+            offset += feed.BOSS.size
+        self.powerups = []
+        for _ in range(header[12]):
+            self.powerups.append(feed.POWERUP.unpack_from(data, offset))
+            offset += feed.POWERUP.size
+        for name, statics in feed.KINDS:
+            columns = feed.DYNAMIC[name]
+            if kind == feed.KEY:
+                n, = struct.unpack_from('<I', data, offset)
+                offset += 4
+                static = np.frombuffer(data, np.uint8, n * statics, offset).reshape(n, statics)
+                offset += static.nbytes
+                q = np.frombuffer(data, np.int16, n * columns, offset).reshape(n, columns)
+                offset += q.nbytes
+                d = np.frombuffer(data, np.int16, n * columns, offset).reshape(n, columns)
+                offset += d.nbytes
+                self.kinds[name] = (static, q, d)
+                continue
+            prev_static, prev_q, prev_d = self.kinds[name]
+            n_prev, n_new = struct.unpack_from('<II', data, offset)
+            offset += 8
+            if n_prev != len(prev_q):
+                raise ValueError("spectator stream out of sync")
+            keep = np.unpackbits(np.frombuffer(data, np.uint8, (n_prev + 7) // 8, offset),
+                                 count=n_prev).astype(np.bool_)
+            offset += (n_prev + 7) // 8
+            static = np.frombuffer(data, np.uint8, n_new * statics, offset).reshape(n_new, statics)
+            offset += static.nbytes
+            new_q = np.frombuffer(data, np.int16, n_new * columns, offset).reshape(n_new, columns)
+            offset += new_q.nbytes
+            kept = int(np.count_nonzero(keep))
+            dd = np.frombuffer(data, np.int16, kept * columns, offset).reshape(kept, columns)
+            offset += dd.nbytes
+            kept_d = prev_d[keep] + dd
+            self.kinds[name] = (np.concatenate((prev_static[keep], static)),
+                                np.concatenate((prev_q[keep] + kept_d, new_q)),
+                                np.concatenate((kept_d, np.zeros_like(new_q))))
+        self.header = header
+        self.synced = True
+        self.frames += 1
+
+    def draw(self, screen, hud: 'Hud'):
+        """Draw the last applied tick (no particles, no interpolation)."""
+        screen.fill(BLACK)
+        if self.header is None:
+            screen.blit(hud.text('status', "Waiting for the game...", WHITE), (10, 10))
+            return
+        q = SpectatorFeed.QUANT
+        (_, ticks, state, wave, score, lives, bombs, shield, px, py, invincible,
+         _, _) = self.header
+        for x, y, powerup_type, radius in self.powerups:
+            powerup_type = PowerUpType(powerup_type)
+            sprite = SPRITES.powerup(powerup_type, PowerUp.COLORS[powerup_type], radius)
+            SPRITES.blit(screen, sprite, x / q, y / q)
+
+        static, dynamic, _ = self.kinds['bullets']
+        for (r, g, b, radius), (x, y) in zip(static.tolist(), dynamic.tolist()):
+            SPRITES.blit(screen, SPRITES.bullet((r, g, b), radius), x / q, y / q)
+
+        static, dynamic, _ = self.kinds['enemies']
+        for (enemy_type, max_health), (x, y, health) in zip(static.tolist(), dynamic.tolist()):
+            x /= q
+            y /= q
+            SPRITES.blit(screen, SPRITES.enemy(Enemy.COLORS[enemy_type % len(Enemy.COLORS)]), x, y)
+            if max_health > 1:
+                left = x - Enemy.WIDTH // 2
+                top = y - Enemy.HEIGHT // 2 - 8
+                pygame.draw.rect(screen, RED, (left, top, Enemy.WIDTH, 3))
+                pygame.draw.rect(screen, GREEN, (left, top, int(Enemy.WIDTH * health / max_health), 3))
+
+        if self.boss:
+            x, y, health, max_health, phase = self.boss
+            SPRITES.blit(screen, SPRITES.boss(RED if phase >= 1 else ORANGE), x / q, y / q)
+            bar_width = 160
+            bar_x = x / q - bar_width // 2
+            pygame.draw.rect(screen, (50, 50, 50), (bar_x, 20, bar_width, 10))
+            pygame.draw.rect(screen, RED, (bar_x, 20, int(bar_width * health / max_health), 10))
+
+        if not (invincible > 0 and (invincible // 5) % 2 == 0):
+            SPRITES.blit(screen, SPRITES.player(shield), px / q, py / q)
+
+        screen.blit(hud.text('score', f"Score: {score}", WHITE), (10, 10))
+        screen.blit(hud.text('wave', f"Wave: {wave}", WHITE), (SCREEN_WIDTH - 120, 10))
+        status = f"Lives {lives}  Bombs {bombs}  Tick {ticks}  {GameState(state).name}"
+        screen.blit(hud.text('status', status, YELLOW), (10, SCREEN_HEIGHT - 30))
+
+
+def parse_address(address: str) -> Tuple[int, object]:
+    """'unix:/path' or '[host:]port' (default host 127.0.0.1) to (family, address)."""
+    if address.startswith('unix:'):
+        return socket.AF_UNIX, address[5:]
+    host, _, port = address.rpartition(':')
+    return socket.AF_INET, (host or '127.0.0.1', int(port))
+
+
+class SpectatorServer:
+    """Publishes a SpectatorFeed to any number of viewers on a local socket.
+
+    publish() runs at the end of every tick and never blocks: new viewers
+    are accepted and sent a keyframe, and each viewer's messages go out with
+    non-blocking sends. A viewer that falls more than max_backlog bytes
+    behind has its queued messages dropped and gets a fresh keyframe, so a
+    slow viewer costs bounded memory and never stalls the game.
+    """
+    def __init__(self, address: str, keyframe_interval: int = SPECTATOR_KEYFRAMES,
+                 max_backlog: int = 1 << 20):
+        family, self.address = parse_address(address)
+        self.listener = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_UNIX:
+            try:
+                os.unlink(self.address)
+            except FileNotFoundError:
+                pass
+        else:
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(self.address)
+        self.listener.listen()
+        self.listener.setblocking(False)
+        self.feed = SpectatorFeed()
+        self.keyframe_interval = keyframe_interval
+        self.max_backlog = max_backlog
+        # Per viewer: [socket, queued messages, bytes of the first already sent, needs keyframe]
+        self.viewers = []
+        self.bytes_sent = 0
+
+    def accept(self):
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            conn.setblocking(False)
+            self.viewers.append([conn, [SpectatorFeed.MAGIC + bytes((SpectatorFeed.VERSION,))], 0, True])
+
+    def publish(self, game: 'Game'):
+        self.accept()
+        if not self.viewers:
+            return
+        periodic = game.ticks % self.keyframe_interval == 0
+        delta, key = self.feed.encode(game, periodic or any(v[3] for v in self.viewers))
+        for viewer in self.viewers:
+            if viewer[3] or periodic:
+                viewer[1].append(key)
+                viewer[3] = False
+            else:
+                viewer[1].append(delta)
+            backlog = sum(map(len, viewer[1])) - viewer[2]
+            if backlog > self.max_backlog:
+                # Keep the message in flight, drop the rest, resync next tick
+                del viewer[1][1:]
+                viewer[3] = True
+        self.flush()
+
+    def flush(self):
+        for viewer in self.viewers[:]:
+            conn, messages = viewer[0], viewer[1]
+            try:
+                while messages:
+                    sent = conn.send(memoryview(messages[0])[viewer[2]:])
+                    self.bytes_sent += sent
+                    viewer[2] += sent
+                    if viewer[2] < len(messages[0]):
+                        break
+                    messages.pop(0)
+                    viewer[2] = 0
+            except (BlockingIOError, InterruptedError):
+                pass
+            except OSError:
+                conn.close()
+                self.viewers.remove(viewer)
+
+    def close(self):
+        for viewer in self.viewers:
+            viewer[0].close()
+        self.viewers = []
+        self.listener.close()
+        if self.listener.family == socket.AF_UNIX:
+            try:
+                os.unlink(self.address)
+            except OSError:
+                pass
+
+
+class ScoreStore:
+    """Persistent run history and high scores in a local SQLite database.
+
+    Every finished run is appended to the `runs` table and the best TOP_SCORES
+    are kept in `top_scores`. record() only queues the run: a background
+    thread commits whatever has piled up in one transaction and then
+    refreshes the in-memory top table, so the game loop never waits on disk
+    and reads (top(), best()) are plain list lookups.
+    """
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS runs (
+               id INTEGER PRIMARY KEY,
+               played_at REAL NOT NULL,
+               score INTEGER NOT NULL,
+               wave INTEGER NOT NULL,
+               outcome TEXT NOT NULL,
+               seed INTEGER,
+               ticks INTEGER NOT NULL)""",
+        """CREATE TABLE IF NOT EXISTS top_scores (
+               run_id INTEGER PRIMARY KEY REFERENCES runs(id),
+               score INTEGER NOT NULL,
+               wave INTEGER NOT NULL,
+               played_at REAL NOT NULL)""",
+        "CREATE INDEX IF NOT EXISTS top_scores_score ON top_scores (score DESC)",
+    )
+    # Sentinel that tells the writer thread to flush and exit
+    CLOSE = None
+
+    def __init__(self, path: str = SCORES_PATH, top_n: int = TOP_SCORES, legacy_path: str = "highscore.txt"):
+        self.path = path
+        self.top_n = top_n
+        self.queue = queue.Queue()
+        self.error: Optional[str] = None
+        self._top: List[Tuple[int, int, float]] = []
+        # Schema and the first read happen once, up front; after that only
+        # the writer thread touches the database
+        try:
+            db = self.connect()
+            with db:
+                for statement in self.SCHEMA:
+                    db.execute(statement)
+                if legacy_path and not db.execute("SELECT 1 FROM runs LIMIT 1").fetchone():
+                    self.import_legacy(db, legacy_path)
+            self._top = self.read_top(db)
+            db.close()
+        except sqlite3.Error as error:
+            self.fail(error)
+        self.writer = threading.Thread(target=self.write_loop, name="score-writer", daemon=True)
+        self.writer.start()
+
+    def connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, timeout=5)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def fail(self, error: Exception):
+        # Scores are nice to have; report once and keep the game running
+        if self.error is None:
+            print(f"Score store disabled ({self.path}): {error}", file=sys.stderr)
+        self.error = str(error)
+
+    def import_legacy(self, db: sqlite3.Connection, path: str):
+        """Carry over the single score from the old highscore.txt file."""
+        try:
+            with open(path) as f:
+                score = int(f.read().strip())
+        except (OSError, ValueError):
+            return
+        self.insert(db, [(time.time(), score, 0, 'legacy', None, 0)])
+
+    def insert(self, db: sqlite3.Connection, runs: list):
+        for run in runs:
+            run_id = db.execute("INSERT INTO runs (played_at, score, wave, outcome, seed, ticks) "
+                                "VALUES (?, ?, ?, ?, ?, ?)", run).lastrowid
+            db.execute("INSERT INTO top_scores (run_id, score, wave, played_at) VALUES (?, ?, ?, ?)",
+                       (run_id, run[1], run[2], run[0]))
+        db.execute("DELETE FROM top_scores WHERE run_id NOT IN "
+                   "(SELECT run_id FROM top_scores ORDER BY score DESC, run_id LIMIT ?)", (self.top_n,))
+
+    def read_top(self, db: sqlite3.Connection) -> List[Tuple[int, int, float]]:
+        return db.execute("SELECT score, wave, played_at FROM top_scores "
+                          "ORDER BY score DESC, run_id LIMIT ?", (self.top_n,)).fetchall()
+
+    def record(self, score: int, wave: int, outcome: str, seed: Optional[int] = None, ticks: int = 0):
+        """Queue a finished run for writing; returns immediately."""
+        if seed is not None and seed != fold_seed(seed):
+            # SQLite integers are 64-bit; failing here keeps the writer alive
+            raise ValueError(f"seeds must fit in 64 bits (see fold_seed): {seed}")
+        self.queue.put((time.time(), score, wave, outcome, seed, ticks))
+
+    def top(self, n: Optional[int] = None) -> List[Tuple[int, int, float]]:
+        """The cached best runs as (score, wave, played_at), best first."""
+        return self._top[:n]
+
+    def best(self) -> int:
+        top = self._top
+        return top[0][0] if top else 0
+
+    def write_loop(self):
+        db = None
+        while True:
+            runs = [self.queue.get()]
+            # Batch everything that queued up while we were waiting
+            while True:
+                try:
+                    runs.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            closing = self.CLOSE in runs
+            runs = [run for run in runs if run is not self.CLOSE]
+            if runs and self.error is None:
+                try:
+                    db = db or self.connect()
+                    with db:
+                        self.insert(db, runs)
+                    # Swap in the new table in one assignment; readers never lock
+                    self._top = self.read_top(db)
+                except sqlite3.Error as error:
+                    self.fail(error)
+            for _ in range(len(runs) + closing):
+                self.queue.task_done()
+            if closing:
+                if db is not None:
+                    db.close()
+                return
+
+    def flush(self):
+        """Block until every queued run has been written."""
+        self.queue.join()
+
+    def close(self):
+        """Write what is still queued and stop the writer thread."""
+        if self.writer.is_alive():
+            self.queue.put(self.CLOSE)
+            self.writer.join()
+
+
+class Hud:
+    """Cached text and overlay surfaces for the UI.
+
+    Dynamic values (score, wave, timers) each own a slot that is only
+    re-rendered when its text changes. Static screen text is composited once
+    into a transparent full-screen layer, and the translucent dimming
+    overlays are built once per alpha. Layers are canvas-sized: with a render
+    scale, the fonts passed in should be scaled to match.
+    """
+    # Static text per screen: (font, text, color, y), centered horizontally
+    LAYERS = {
+        'menu': (('big', "SPACE INVADERS", CYAN, 150),
+                 ('normal', "Bullet Hell Edition", WHITE, 220),
+                 ('normal', "Press ENTER to Start", GREEN, 350),
+                 ('normal', "WASD/Arrows: Move | SPACE: Shoot | B: Bomb", WHITE, 420)),
+        'pause': (('big', "PAUSED", WHITE, 250),
+                  ('normal', "Press P to Resume", GREEN, 330)),
+        'game_over': (('big', "GAME OVER", RED, 200),
+                      ('normal', "Press ENTER to Restart", GREEN, 400)),
+        'victory': (('big', "VICTORY!", YELLOW, 200),
+                    ('normal', "You saved Earth from the alien invasion!", CYAN, 330),
+                    ('normal', "Press ENTER to Play Again", GREEN, 400)),
+    }
+
+    def __init__(self, fonts: dict, scale: float = 1.0):
+        self.fonts = fonts
+        self.size = (int(SCREEN_WIDTH * scale), int(SCREEN_HEIGHT * scale))
+        self.scale = scale
+        self.slots = {}
+        self.layers = {}
+        self.dims = {}
+
+    def text(self, slot: str, text: str, color: tuple, font: str = 'normal') -> pygame.Surface:
+        cached = self.slots.get(slot)
+        if cached is None or cached[0] != text or cached[1] != color:
+            cached = (text, color, self.fonts[font].render(text, True, color))
+            self.slots[slot] = cached
+        return cached[2]
+
+    def layer(self, name: str) -> pygame.Surface:
+        surface = self.layers.get(name)
+        if surface is None:
+            surface = pygame.Surface(self.size, pygame.SRCALPHA)
+            for font, text, color, y in self.LAYERS[name]:
+                rendered = self.fonts[font].render(text, True, color)
+                surface.blit(rendered, (self.size[0] // 2 - rendered.get_width() // 2, int(y * self.scale)))
+            self.layers[name] = surface
+        return surface
+
+    def dim(self, alpha: int) -> pygame.Surface:
+        surface = self.dims.get(alpha)
+        if surface is None:
+            surface = pygame.Surface(self.size, pygame.SRCALPHA)
+            surface.fill((0, 0, 0, alpha))
+            self.dims[alpha] = surface
+        return surface
+
+
+class QualityGovernor:
+    """Trades visual detail for frame time when frames run over budget.
+
+    observe() takes each frame's work time (simulation plus drawing, without
+    the frame limiter's sleep). When the rolling mean exceeds the budget the
+    level steps up one notch; once frames have stayed well under budget for
+    a while it steps back down. Every change waits a full window, so the
+    mean reflects the new level before the next decision.
+    """
+    # Per level: (explosion particle scale, bullet glow, full starfield, detailed enemies)
+    LEVELS = (
+        (1.0, True, True, True),
+        (0.5, True, True, True),
+        (0.5, False, True, True),
+        (0.25, False, False, True),
+        (0.25, False, False, False),
+    )
+
+    def __init__(self, budget_ms: float = 1000.0 / FPS, window: int = 30,
+                 headroom: float = 0.6, recover_frames: int = 180):
+        self.budget = budget_ms / 1000.0
+        self.headroom = headroom
+        self.recover_frames = recover_frames
+        self.samples = np.zeros(window)
+        self.frames = 0
+        self.level = 0
+        self.settle = window  # Frames left before the next decision
+        self.calm = 0         # Consecutive frames under the recovery threshold
+
+    def observe(self, seconds: float) -> bool:
+        """Record one frame's work time; returns True if the level changed."""
+        self.samples[self.frames % len(self.samples)] = seconds
+        self.frames += 1
+        self.calm = self.calm + 1 if seconds < self.budget * self.headroom else 0
+        if self.settle > 0:
+            self.settle -= 1
+            return False
+        if self.level < len(self.LEVELS) - 1 and self.samples.mean() > self.budget:
+            self.level += 1
+        elif self.level > 0 and self.calm >= self.recover_frames:
+            self.level -= 1
+        else:
+            return False
+        self.settle = len(self.samples)
+        self.calm = 0
+        return True
+
+    @property
+    def settings(self) -> tuple:
+        return self.LEVELS[self.level]
+
+
+class FrameProfiler:
+    """Per-phase frame timings and entity counts over a rolling window.
+
+    Phases are timed with perf_counter_ns and summed over a frame (a frame may
+    run several catch-up ticks), then end_frame() stores the totals in a
+    fixed-size ring buffer that percentiles are computed from. "update"
+    includes the nested "collisions" and "particles" phases. Other threads
+    (the RenderPipeline worker) time into totals of their own, which take()
+    hands back for the owning thread to merge().
+    """
+    PHASES = ('update', 'collisions', 'particles', 'draw', 'flip', 'frame')
+    COUNTS = ('bullets', 'enemies', 'particles', 'powerups', 'quality')
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, window: int = 600, enabled: bool = True):
+        self.window = window
+        self.enabled = enabled
+        self.visible = False
+        self.frames = 0
+        self.times = {name: np.zeros(window, dtype=np.int64) for name in self.PHASES}
+        self.counts = {name: np.zeros(window, dtype=np.int32) for name in self.COUNTS}
+        self.current = dict.fromkeys(self.PHASES, 0)
+        self.local = threading.local()
+        self.local.current = self.current
+        self.frame_start = time.perf_counter_ns()
+        self.overlay = None
+        self.overlay_age = 0
+
+    @contextmanager
+    def measure(self, phase: str):
+        if not self.enabled:
+            yield
+            return
+        current = self.totals()
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            current[phase] += time.perf_counter_ns() - start
+
+    def totals(self) -> dict:
+        """The phase totals the calling thread is timing into."""
+        current = getattr(self.local, 'current', None)
+        if current is None:
+            current = self.local.current = dict.fromkeys(self.PHASES, 0)
+        return current
+
+    def take(self) -> dict:
+        """Return and reset the calling thread's phase totals."""
+        current = self.totals()
+        taken = dict(current)
+        for name in current:
+            current[name] = 0
+        return taken
+
+    def merge(self, totals: dict):
+        """Add phase totals taken on another thread into the current frame."""
+        for name, total in totals.items():
+            self.current[name] += total
+
+    def end_frame(self, game: 'Game'):
+        """Close the current frame: store its phase totals and entity counts."""
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        self.current['frame'] = now - self.frame_start
+        self.frame_start = now
+        slot = self.frames % self.window
+        for name, total in self.current.items():
+            self.times[name][slot] = total
+            self.current[name] = 0
+        self.counts['bullets'][slot] = len(game.bullets)
+        self.counts['enemies'][slot] = len(game.formation) + (1 if game.boss else 0)
+        self.counts['particles'][slot] = len(game.particles)
+        self.counts['powerups'][slot] = len(game.powerups)
+        self.counts['quality'][slot] = game.governor.level
+        self.frames += 1
+
+    def stats(self) -> dict:
+        """Percentiles (ms) per phase and entity count stats over the window."""
+        filled = min(self.frames, self.window)
+        phases = {}
+        for name, samples in self.times.items():
+            ms = samples[:filled] / 1e6
+            if not filled:
+                ms = np.zeros(1)
+            row = {f'p{q}': float(v) for q, v in zip(self.PERCENTILES, np.percentile(ms, self.PERCENTILES))}
+            row['mean'] = float(ms.mean())
+            row['max'] = float(ms.max())
+            phases[name] = row
+        counts = {}
+        for name, samples in self.counts.items():
+            values = samples[:filled] if filled else np.zeros(1, dtype=np.int32)
+            counts[name] = {'last': int(samples[(self.frames - 1) % self.window]) if filled else 0,
+                            'p95': float(np.percentile(values, 95)),
+                            'max': int(values.max())}
+        return {'frames': self.frames, 'window': filled, 'phases': phases, 'counts': counts}
+
+    def draw(self, screen, font):
+        """Draw the stats panel; text is re-rendered a few times per second."""
+        if self.overlay is None or self.overlay_age >= 15:
+            stats = self.stats()
+            rows = [('phase (ms)', 'p50', 'p95', 'p99')]
+            for name in self.PHASES:
+                row = stats['phases'][name]
+                label = ('  ' + name) if name in ('collisions', 'particles') else name
+                rows.append((label, *(f"{row[f'p{q}']:.2f}" for q in self.PERCENTILES)))
+            rows.append(('count', 'now', 'p95', 'max'))
+            for name in self.COUNTS:
+                count = stats['counts'][name]
+                rows.append((name, str(count['last']), f"{count['p95']:.0f}", str(count['max'])))
+            # Proportional font: label left-aligned, numbers right-aligned per column
+            line_height = font.get_linesize()
+            self.overlay = pygame.Surface((250, len(rows) * line_height + 8), pygame.SRCALPHA)
+            self.overlay.fill((0, 0, 0, 170))
+            for i, (label, *values) in enumerate(rows):
+                y = 4 + i * line_height
+                self.overlay.blit(font.render(label, True, GREEN), (6, y))
+                for column, value in enumerate(values):
+                    text = font.render(value, True, GREEN)
+                    self.overlay.blit(text, (140 + column * 50 - text.get_width(), y))
+            self.overlay_age = 0
+        self.overlay_age += 1
+        screen.blit(self.overlay, (screen.get_width() - self.overlay.get_width() - 8, 50))
+
+    def dump(self, path: str):
+        """Write the window's stats and raw samples to a JSON file."""
+        filled = min(self.frames, self.window)
+        # Oldest frame first
+        order = (np.arange(filled) + (self.frames - filled)) % self.window
+        data = {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'numpy': np.__version__,
+            **self.stats(),
+            'samples': {
+                **{name: (self.times[name][order] / 1e6).round(4).tolist() for name in self.PHASES},
+                **{name: self.counts[name][order].tolist() for name in self.COUNTS},
+            },
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=1)
+
+
+class Game:
+    """Main game class.
+
+    With headless=True no window or clock is created: the game starts in the
+    PLAYING state and is driven through step(), reading controls from
+    input_source each tick. All gameplay randomness comes from self.rng, so
+    the same seed and inputs always reproduce the same run.
+
+    Frames are drawn onto self.screen, a canvas render_scale times the
+    SCREEN_WIDTH x SCREEN_HEIGHT game area (0.5 is half resolution), and
+    presented on self.display, the window. Gameplay coordinates do not
+    change with the scale. With sdl_scaled, SDL's SCALED mode upscales the
+    canvas itself; otherwise draw() stretches it with pygame.transform.scale.
+
+    Finished runs go to the ScoreStore unless persist_scores is False, which
+    is the default for headless games.
+    """
+    # Snapshot layout: magic, version, ticks, state, wave counters, boss flag;
+    # then fixed-size sections (see snapshot())
+    SNAPSHOT_MAGIC = b'SISN'
+    SNAPSHOT_VERSION = 7
+    SNAPSHOT_HEADER = struct.Struct('<4sBIBhi??')
+
+    def __init__(self, max_particles: int = MAX_PARTICLES, headless: bool = False,
+                 seed: Optional[int] = None,
+                 input_source: Optional[Callable[['Game'], int]] = None,
+                 profile_path: Optional[str] = None, star_density: int = 100,
+                 render_scale: float = 1.0, sdl_scaled: bool = False,
+                 persist_scores: Optional[bool] = None):
+        self.headless = headless
+        self.render_scale = render_scale
+        SPRITES.set_scale(render_scale)
+        logical = (int(SCREEN_WIDTH * render_scale), int(SCREEN_HEIGHT * render_scale))
+        if headless:
+            # Offscreen target so draw() still works for benchmarks and tests
+            self.display = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+            self.clock = None
+        else:
+            self.display = None
+            if sdl_scaled:
+                # SDL scales the canvas to the window (and to high-DPI displays);
+                # it needs a renderer, so fall back to scaling it ourselves
+                try:
+                    self.display = pygame.display.set_mode(logical, pygame.SCALED)
+                except pygame.error:
+                    pass
+            if self.display is None:
+                self.display = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        if not headless:
+            pygame.display.set_caption("Space Invaders: Bullet Hell Edition")
+            self.clock = pygame.time.Clock()
+        if self.display.get_size() == logical:
+            self.screen = self.display
+        else:
+            self.screen = pygame.Surface(logical)
+            if not headless:
+                self.screen = self.screen.convert()
+        self.font = pygame.font.Font(None, max(1, int(36 * render_scale)))
+        self.big_font = pygame.font.Font(None, max(1, int(72 * render_scale)))
+        # The profiler overlay is drawn on the display, unscaled
+        self.small_font = pygame.font.Font(None, 22)
+        self.hud = Hud({'normal': self.font, 'big': self.big_font}, render_scale)
+
+        # Any int is a valid seed; it is used wrapped, so it can be recorded
+        seed = fold_seed(seed)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.replay: Optional[Replay] = None
+        self.recording = False  # Record each new game into self.replay
+        self.keyboard = KeyboardInput()
+        self.input_source = input_source or self.keyboard
+        # Headless runs (and replays, see from_replay) must never touch the
+        # player's score database
+        self.persist_scores = not headless if persist_scores is None else persist_scores
+        self.scores: Optional[ScoreStore] = ScoreStore() if self.persist_scores else None
+
+        self.state = GameState.PLAYING if headless else GameState.MENU
+        self.star_density = star_density
+        self.starfield = StarField(seed, star_density, render_scale)
+        self.particles = ParticleSystem(max_particles, seed)
+        # Frames only exist in run(), so headless games skip the bookkeeping
+        self.profiler = FrameProfiler(enabled=not headless)
+        self.profile_path = profile_path
+        # Only run() feeds it frame times, so headless games keep full detail
+        self.governor = QualityGovernor()
+        self.spectators: Optional[SpectatorServer] = None
+        # Cleared while a RenderPipeline simulates this game: it is never
+        # drawn then, so its bullets build no sprites on the worker thread
+        self.drawn = True
+        # Moves on whenever entity ids may repeat (fresh stores, restore()),
+        # so id-tracking observers like SpectatorFeed know to start over
+        self.timeline = 0
         self.reset_game()
 
     def reset_game(self):
+        self.timeline += 1
         self.player = Player()
-        self.enemies: List[Enemy] = []
-        self.bullets: List[Bullet] = []
-        self.powerups: List[PowerUp] = []
-        self.particles: List[Particle] = []
+        self.ticks = 0
+        self.formation = Formation(self.rng)
+        self.enemy_grid = SpatialHash()
+        self.bullets = BulletStore(drawn=self.drawn)
+        self.apply_quality()
+        self.powerups = PowerUpStore()
+        self.particles.clear()
         self.boss: Optional[Boss] = None
         self.wave = 1
-        self.wave_enemies_remaining = 0
         self.wave_delay = 0
         self.boss_wave = False
         self.high_score = self.load_high_score()
+        self.run_recorded = False
         self.spawn_wave()
 
+    def reseed(self, seed: Optional[int]):
+        """Start a fresh game exactly as Game(seed=seed) would."""
+        seed = fold_seed(seed)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.starfield = StarField(seed, self.star_density, self.render_scale)
+        self.particles.reseed(seed)
+        self.reset_game()
+
+    def start_recording(self):
+        """Restart from a known seed and record every tick's controls."""
+        seed = self.seed if self.seed is not None else random.getrandbits(32)
+        self.reseed(seed)
+        self.replay = Replay(seed)
+        self.recording = True
+
+    @classmethod
+    def from_replay(cls, replay: Replay, headless: bool = True, **options) -> 'Game':
+        """A game that plays the replay back; its input source is a ReplayPlayer.
+
+        options are passed on to Game (render_scale, sdl_scaled, ...).
+        """
+        # Watching a replay must not touch the high score file
+        game = cls(headless=headless, seed=replay.seed, input_source=ReplayPlayer(replay),
+                   persist_scores=False, **options)
+        game.state = GameState.PLAYING
+        return game
+
+    def snapshot(self) -> bytes:
+        """Serialize the simulation state into a compact binary blob.
+
+        The player and boss are fixed-layout struct records and the entity
+        stores and particles are raw array slices, so restore() is mostly
+        memcpy. Sprites, fonts, starfield layers and other caches are rebuilt
+        from the data, never stored.
+        """
+        parts = [self.SNAPSHOT_HEADER.pack(
+                     self.SNAPSHOT_MAGIC, self.SNAPSHOT_VERSION, self.ticks, self.state.value,
+                     self.wave, self.wave_delay, self.boss_wave, self.boss is not None),
+                 pack_random(self.rng),
+                 self.player.pack(),
+                 self.formation.pack()]
+        if self.boss:
+            parts.append(self.boss.pack())
+        parts.append(self.powerups.pack())
+        parts.append(self.bullets.pack())
+        parts.append(self.particles.pack())
+        parts.append(self.starfield.pack())
+        return b''.join(parts)
+
+    def restore(self, data: bytes):
+        """Return to a state captured by snapshot()."""
+        self.timeline += 1
+        (magic, version, self.ticks, state, self.wave, self.wave_delay, self.boss_wave,
+         has_boss) = self.SNAPSHOT_HEADER.unpack_from(data)
+        if magic != self.SNAPSHOT_MAGIC or version != self.SNAPSHOT_VERSION:
+            raise ValueError("not a game snapshot, or an unsupported version")
+        self.state = GameState(state)
+        offset = unpack_random(self.rng, data, self.SNAPSHOT_HEADER.size)
+        self.player = Player.unpack(data, offset)
+        offset += Player.STATE.size
+        offset = self.formation.unpack(data, offset)
+        self.boss = None
+        if has_boss:
+            self.boss = Boss.unpack(data, offset, self.rng)
+            offset += Boss.STATE.size
+        offset = self.powerups.unpack(data, offset)
+        offset = self.bullets.unpack(data, offset)
+        offset = self.particles.unpack(data, offset)
+        self.starfield.unpack(data, offset)
+
     def load_high_score(self) -> int:
-        try:
-            with open("highscore.txt", "r") as f:
-                return int(f.read().strip())
-        except:
+        if not self.persist_scores or self.scores is None:
             return 0
+        return self.scores.best()
 
     def save_high_score(self):
-        if self.player.score > self.high_score:
-            self.high_score = self.player.score
-            try:
-                with open("highscore.txt", "w") as f:
-                    f.write(str(self.high_score))
-            except:
-                pass
+        """Record the finished run; the score store writes it in the background."""
+        self.high_score = max(self.high_score, self.player.score)
+        if self.run_recorded or not self.persist_scores or self.scores is None:
+            return
+        self.run_recorded = True
+        outcome = 'victory' if self.state == GameState.VICTORY else 'game_over'
+        self.scores.record(self.player.score, self.wave, outcome, self.seed, self.ticks)
 
     def spawn_wave(self):
         """Spawn a new wave of enemies."""
@@ -643,7 +2908,7 @@ class Game:
         # Boss every 5 waves
         if self.wave % 5 == 0:
             self.boss_wave = True
-            self.boss = Boss(self.wave // 5)
+            self.boss = Boss(self.wave // 5, self.rng)
         else:
             self.boss_wave = False
             self.boss = None
@@ -652,45 +2917,74 @@ class Game:
             rows = min(3 + self.wave // 2, 6)
             cols = min(6 + self.wave // 3, 10)
 
+            enemies = []
             for row in range(rows):
                 for col in range(cols):
                     x = 100 + col * 70
                     y = -50 - row * 50
                     enemy_type = min(row // 2, 3)
-                    self.enemies.append(Enemy(x, y, enemy_type))
+                    enemies.append(Enemy(x, y, enemy_type, self.rng))
+            self.formation.extend(enemies)
+
+    def jump_to_wave(self, wave: int):
+        """Drop the current wave and start the given one (for tooling and tests)."""
+        self.formation.clear()
+        self.boss = None
+        self.wave = wave
+        self.spawn_wave()
+
+    def threats(self) -> ThreatIndex:
+        """A ThreatIndex over the current tick's hostile bullets and enemies."""
+        return ThreatIndex(self)
+
+    @property
+    def wave_enemies_remaining(self) -> int:
+        """Enemies left to clear in this wave, derived from the formation."""
+        return len(self.formation)
+
+    @property
+    def quality_level(self) -> int:
+        """Current QualityGovernor level; 0 is full detail."""
+        return self.governor.level
 
-            self.wave_enemies_remaining = len(self.enemies)
+    def apply_quality(self):
+        """Push the governor's current settings to the draw paths."""
+        self.bullets.set_glow(self.governor.settings[1])
 
-    def spawn_explosion(self, x: float, y: float, color: tuple, count: int = 15):
-        """Create explosion particles."""
-        for _ in range(count):
-            angle = random.uniform(0, 2 * math.pi)
-            speed = random.uniform(2, 6)
-            vx = math.cos(angle) * speed
-            vy = math.sin(angle) * speed
-            lifetime = random.randint(20, 40)
-            self.particles.append(Particle(x, y, color, Vector2(vx, vy), lifetime))
+    def spawn_explosion(self, x, y, color: tuple, count: int = 15):
+        """Create explosion particles (fewer at reduced quality).
+
+        x and y may also be arrays, for one burst of count at each position.
+        """
+        scale = self.governor.settings[0]
+        if scale != 1.0:
+            count = max(1, int(count * scale))
+        self.particles.emit(x, y, color, count)
 
     def spawn_powerup(self, x: float, y: float):
         """Randomly spawn a power-up."""
-        if random.random() < 0.15:  # 15% chance
-            powerup_type = random.choice(list(PowerUpType))
-            self.powerups.append(PowerUp(x, y, powerup_type))
+        if self.rng.random() < 0.15:  # 15% chance
+            powerup_type = self.rng.choice(list(PowerUpType))
+            self.powerups.extend([PowerUp(x, y, powerup_type)])
 
     def use_bomb(self):
         """Clear all enemy bullets and damage all enemies."""
         if self.player.use_bomb():
             # Clear enemy bullets
-            for bullet in self.bullets[:]:
-                if not bullet.is_player:
-                    self.spawn_explosion(bullet.x, bullet.y, WHITE, 5)
-            self.bullets = [b for b in self.bullets if b.is_player]
-
-            # Damage all enemies
-            for enemy in self.enemies:
-                enemy.hit(2)
-                self.spawn_explosion(enemy.x, enemy.y, enemy.color, 8)
-            self.enemies = [e for e in self.enemies if e.health > 0]
+            xs, ys = self.bullets.clear_enemy_bullets()
+            self.spawn_explosion(xs, ys, WHITE, 5)
+
+            # Damage all enemies, with one explosion batch per enemy color
+            formation = self.formation
+            n = len(formation)
+            if n:
+                formation.health[:n] -= 2
+                types = formation.enemy_type[:n]
+                for enemy_type, color in enumerate(Enemy.COLORS):
+                    hit = types == enemy_type
+                    if hit.any():
+                        self.spawn_explosion(formation.x[:n][hit], formation.y[:n][hit], color, 8)
+                formation.remove_dead()
 
             # Damage boss
             if self.boss:
@@ -698,32 +2992,66 @@ class Game:
                 self.spawn_explosion(self.boss.x, self.boss.y, PURPLE, 20)
 
     def handle_collisions(self):
-        """Check and handle all collisions."""
-        player_rect = self.player.get_rect()
-
-        # Player bullets vs enemies
-        for bullet in self.bullets[:]:
-            if not bullet.is_player:
-                continue
-            bullet_rect = bullet.get_rect()
-
-            # Check enemies
-            for enemy in self.enemies[:]:
-                if bullet_rect.colliderect(enemy.get_rect()):
-                    if enemy.hit(bullet.damage):
-                        self.player.score += enemy.points
-                        self.spawn_explosion(enemy.x, enemy.y, enemy.color)
-                        self.spawn_powerup(enemy.x, enemy.y)
-                        self.enemies.remove(enemy)
-                        self.wave_enemies_remaining -= 1
-                    if bullet in self.bullets:
-                        self.bullets.remove(bullet)
+        """Check and handle all collisions.
+
+        Player bullets find the enemies they overlap through a SpatialHash of
+        the formation, rebuilt every tick; the boss, player and power-ups
+        are single rects tested in one vectorized pass each. Only actual
+        hits are then walked, in the order the old nested list scans used,
+        so scoring, explosions and power-up rolls happen in the same
+        sequence. Spent bullets, dead enemies and collected power-ups are
+        only destroy()ed here; update() flushes them at the end of the tick.
+        """
+        formation = self.formation
+        bullets = self.bullets
+        left, top, size = bullets.rects()
+
+        # Player bullets vs enemies, then boss: a bullet hits the first live
+        # enemy it overlaps, or else the boss
+        shots = np.flatnonzero(bullets.is_player[:bullets.count])
+        n = len(formation)
+        if shots.size and (n or self.boss):
+            shot_left = left[shots]
+            shot_top = top[shots]
+            shot_size = size[shots]
+            grid = self.enemy_grid
+            if n:
+                enemy_left, enemy_top = formation.rects()
+                grid.build(enemy_left, enemy_top, Enemy.WIDTH, Enemy.HEIGHT)
+            else:
+                grid.clear()
+            rows, keys = grid.query(shot_left, shot_top, shot_size, shot_size)
+            hit_rows = np.zeros(shots.size, dtype=np.bool_)
+            hit_rows[rows] = True
+            # Each shot's enemies are keys[bounds[row]:bounds[row + 1]], in spawn order
+            bounds = np.searchsorted(rows, np.arange(shots.size + 1))
+            if self.boss:
+                boss_rect = self.boss.get_rect()
+                boss_hits = ((shot_left < boss_rect.right) & (shot_left + shot_size > boss_rect.left)
+                             & (shot_top < boss_rect.bottom) & (shot_top + shot_size > boss_rect.top))
+            else:
+                boss_hits = np.zeros(shots.size, dtype=np.bool_)
+
+            for row in np.flatnonzero(hit_rows | boss_hits).tolist():
+                index = int(shots[row])
+                damage = int(bullets.damage[index])
+                for key in keys[bounds[row]:bounds[row + 1]].tolist():
+                    if formation.doomed[key]:
+                        continue
+                    if formation.hit(key, damage):
+                        x = float(formation.x[key])
+                        y = float(formation.y[key])
+                        self.player.score += int(formation.points[key])
+                        self.spawn_explosion(x, y, formation.color(key))
+                        self.spawn_powerup(x, y)
+                        formation.destroy(key)
+                    bullets.destroy(index)
                     break
-
-            # Check boss
-            if self.boss and bullet in self.bullets:
-                if bullet_rect.colliderect(self.boss.get_rect()):
-                    if self.boss.hit(bullet.damage):
+                else:
+                    # Boss may already have died to an earlier bullet this tick
+                    if not boss_hits[row] or self.boss is None:
+                        continue
+                    if self.boss.hit(damage):
                         self.player.score += self.boss.points
                         self.spawn_explosion(self.boss.x, self.boss.y, PURPLE, 50)
                         self.boss = None
@@ -733,74 +3061,101 @@ class Game:
                             self.save_high_score()
                         else:
                             self.spawn_wave()
-                    self.bullets.remove(bullet)
-
-        # Enemy bullets vs player
-        for bullet in self.bullets[:]:
-            if bullet.is_player:
-                continue
-            if bullet.get_rect().colliderect(player_rect):
-                if self.player.hit():
-                    self.state = GameState.GAME_OVER
-                    self.save_high_score()
-                else:
-                    self.spawn_explosion(self.player.x, self.player.y, GREEN, 10)
-                self.bullets.remove(bullet)
+                    bullets.destroy(index)
 
-        # Enemies vs player
-        for enemy in self.enemies[:]:
-            if enemy.get_rect().colliderect(player_rect):
+        # Enemy bullets vs player, as one vectorized AABB test in spawn order
+        player_rect = self.player.get_rect()
+        n = bullets.count
+        hits = ((~bullets.is_player[:n])
+                & (left < player_rect.right) & (left + size > player_rect.left)
+                & (top < player_rect.bottom) & (top + size > player_rect.top))
+        for index in np.flatnonzero(hits).tolist():
+            if self.player.hit():
+                self.state = GameState.GAME_OVER
+                self.save_high_score()
+            else:
+                self.spawn_explosion(self.player.x, self.player.y, GREEN, 10)
+            bullets.destroy(index)
+
+        # Surviving enemies, then power-ups, vs player
+        n = len(formation)
+        if n:
+            enemy_left, enemy_top = formation.rects()
+            touching = ((enemy_left < player_rect.right) & (enemy_left + Enemy.WIDTH > player_rect.left)
+                        & (enemy_top < player_rect.bottom) & (enemy_top + Enemy.HEIGHT > player_rect.top)
+                        & ~formation.doomed[:n])
+            for key in np.flatnonzero(touching).tolist():
                 if self.player.hit():
                     self.state = GameState.GAME_OVER
                     self.save_high_score()
-                self.spawn_explosion(enemy.x, enemy.y, enemy.color)
-                self.enemies.remove(enemy)
-                self.wave_enemies_remaining -= 1
-
-        # Power-ups vs player
-        for powerup in self.powerups[:]:
-            if powerup.get_rect().colliderect(player_rect):
-                self.player.apply_powerup(powerup.powerup_type)
-                self.powerups.remove(powerup)
-                self.spawn_explosion(powerup.x, powerup.y, powerup.color, 8)
-
-    def update(self):
+                self.spawn_explosion(float(formation.x[key]), float(formation.y[key]), formation.color(key))
+                formation.destroy(key)
+
+        powerups = self.powerups
+        if len(powerups):
+            left, top, size = powerups.rects()
+            taken = ((left < player_rect.right) & (left + size > player_rect.left)
+                     & (top < player_rect.bottom) & (top + size > player_rect.top))
+            for key in np.flatnonzero(taken).tolist():
+                powerup_type = powerups.powerup_type(key)
+                self.player.apply_powerup(powerup_type)
+                powerups.destroy(key)
+                self.spawn_explosion(float(powerups.x[key]), float(powerups.y[key]),
+                                     PowerUp.COLORS[powerup_type], 8)
+
+    def tick(self, controls: int):
+        """Advance the simulation one tick with the given control bitmask."""
+        if self.replay is not None:
+            self.replay.record(controls)
+        self.ticks += 1
+        if controls & Controls.PAUSE and self.state in (GameState.PLAYING, GameState.PAUSED):
+            self.state = GameState.PAUSED if self.state == GameState.PLAYING else GameState.PLAYING
+        if controls & Controls.BOMB and self.state == GameState.PLAYING:
+            self.use_bomb()
+        with self.profiler.measure('update'):
+            self.update(controls)
+        if self.spectators is not None:
+            self.spectators.publish(self)
+
+    def step(self, n: int = 1) -> int:
+        """Run up to n ticks back to back, without drawing or throttling.
+
+        Controls come from the input source. Stops early once the run is over
+        and returns the number of ticks simulated.
+        """
+        for done in range(n):
+            if self.state in (GameState.GAME_OVER, GameState.VICTORY):
+                return done
+            self.tick(self.input_source(self))
+        return n
+
+    def advance(self, steps: int):
+        """Run the ticks run() owes for one frame; nothing moves outside play."""
+        for _ in range(steps):
+            if self.state in (GameState.PLAYING, GameState.PAUSED):
+                self.tick(self.input_source(self))
+
+    def update(self, controls: int = 0):
         """Update game state."""
         if self.state != GameState.PLAYING:
             return
 
-        keys = pygame.key.get_pressed()
-
         # Update starfield
         self.starfield.update()
 
         # Update player
-        self.player.update(keys)
+        self.player.update(controls)
 
         # Shooting
-        if keys[pygame.K_SPACE]:
+        if controls & Controls.FIRE:
             self.bullets.extend(self.player.shoot())
 
         # Update bullets
-        self.bullets = [b for b in self.bullets if b.update()]
-
-        # Update enemies
-        for enemy in self.enemies[:]:
-            new_bullets = enemy.update(self.wave)
-            # Aim bullets at player for type 3 enemies
-            for bullet in new_bullets:
-                if enemy.enemy_type >= 3:
-                    dx = self.player.x - bullet.x
-                    dy = self.player.y - bullet.y
-                    dist = math.sqrt(dx * dx + dy * dy)
-                    if dist > 0:
-                        bullet.velocity.x = (dx / dist) * 6
-                        bullet.velocity.y = (dy / dist) * 6
-            self.bullets.extend(new_bullets)
+        self.bullets.update()
 
-            if enemy.is_off_screen():
-                self.enemies.remove(enemy)
-                self.wave_enemies_remaining -= 1
+        # Update enemies: the whole formation moves and fires in one step
+        self.formation.update(self.wave, self.player.x, self.player.y, self.bullets)
+        self.formation.remove_off_screen()
 
         # Update boss
         if self.boss:
@@ -808,18 +3163,25 @@ class Game:
             self.bullets.extend(new_bullets)
 
         # Update power-ups
-        self.powerups = [p for p in self.powerups if p.update()]
+        self.powerups.update()
 
         # Update particles
-        self.particles = [p for p in self.particles if p.update()]
+        with self.profiler.measure('particles'):
+            self.particles.update()
 
         # Check collisions
-        self.handle_collisions()
+        with self.profiler.measure('collisions'):
+            self.handle_collisions()
+
+        # End of tick: drop everything destroyed this tick, one pass per store
+        self.bullets.flush()
+        self.formation.flush()
+        self.powerups.flush()
 
         # Wave management
         if self.wave_delay > 0:
             self.wave_delay -= 1
-        elif not self.boss_wave and self.wave_enemies_remaining <= 0 and not self.enemies:
+        elif not self.boss_wave and not self.wave_enemies_remaining:
             self.wave += 1
             if self.wave > 15:
                 self.state = GameState.VICTORY
@@ -827,17 +3189,37 @@ class Game:
             else:
                 self.spawn_wave()
 
-    def draw(self):
-        """Draw everything."""
+    def draw(self, alpha: float = 1.0, view: Optional['Game'] = None):
+        """Draw everything.
+
+        alpha is how far the next simulation tick is (0..1); moving entities
+        are drawn that far between their previous and current positions.
+        view, if given, is drawn in place of this game (see RenderPipeline).
+        """
+        with self.profiler.measure('draw'):
+            (view or self).draw_frame(alpha)
+            if self.screen is not self.display:
+                pygame.transform.scale(self.screen, self.display.get_size(), self.display)
+            if self.profiler.visible:
+                self.profiler.draw(self.display, self.small_font)
+
+        if not self.headless:
+            with self.profiler.measure('flip'):
+                pygame.display.flip()
+
+    def draw_frame(self, alpha: float):
+        """Draw the current state to the screen surface."""
         self.screen.fill(BLACK)
 
         # Draw starfield
-        self.starfield.draw(self.screen)
+        self.starfield.draw(self.screen, alpha if self.state == GameState.PLAYING else 1.0,
+                            self.governor.settings[2])
 
         if self.state == GameState.MENU:
             self.draw_menu()
         elif self.state == GameState.PLAYING or self.state == GameState.PAUSED:
-            self.draw_game()
+            # Nothing moves while paused, so show the last tick as-is
+            self.draw_game(alpha if self.state == GameState.PLAYING else 1.0)
             if self.state == GameState.PAUSED:
                 self.draw_pause()
         elif self.state == GameState.GAME_OVER:
@@ -847,134 +3229,126 @@ class Game:
             self.draw_game()
             self.draw_victory()
 
-        pygame.display.flip()
-
     def draw_menu(self):
         """Draw main menu."""
-        title = self.big_font.render("SPACE INVADERS", True, CYAN)
-        subtitle = self.font.render("Bullet Hell Edition", True, WHITE)
-        start = self.font.render("Press ENTER to Start", True, GREEN)
-        controls = self.font.render("WASD/Arrows: Move | SPACE: Shoot | B: Bomb", True, WHITE)
-        high = self.font.render(f"High Score: {self.high_score}", True, YELLOW)
-
-        self.screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 150))
-        self.screen.blit(subtitle, (SCREEN_WIDTH // 2 - subtitle.get_width() // 2, 220))
-        self.screen.blit(start, (SCREEN_WIDTH // 2 - start.get_width() // 2, 350))
-        self.screen.blit(controls, (SCREEN_WIDTH // 2 - controls.get_width() // 2, 420))
-        self.screen.blit(high, (SCREEN_WIDTH // 2 - high.get_width() // 2, 480))
-
-    def draw_game(self):
+        self.screen.blit(self.hud.layer('menu'), (0, 0))
+        self.blit_centered(self.hud.text('high_score', f"High Score: {self.high_score}", YELLOW), 480)
+
+    def blit_centered(self, surface: pygame.Surface, y: int):
+        self.screen.blit(surface, (self.screen.get_width() // 2 - surface.get_width() // 2,
+                                   int(y * self.render_scale)))
+
+    def draw_game(self, alpha: float = 1.0):
         """Draw game elements."""
         # Draw particles (behind everything)
-        for particle in self.particles:
-            particle.draw(self.screen)
+        self.particles.draw(self.screen, alpha)
 
         # Draw power-ups
-        for powerup in self.powerups:
-            powerup.draw(self.screen)
+        self.powerups.draw(self.screen, alpha)
 
         # Draw bullets
-        for bullet in self.bullets:
-            bullet.draw(self.screen)
+        self.bullets.draw(self.screen, alpha)
 
         # Draw enemies
-        for enemy in self.enemies:
-            enemy.draw(self.screen)
+        self.formation.draw(self.screen, alpha, self.governor.settings[3])
 
         # Draw boss
         if self.boss:
-            self.boss.draw(self.screen)
+            self.boss.draw(self.screen, alpha)
 
         # Draw player
-        self.player.draw(self.screen)
+        self.player.draw(self.screen, alpha)
 
         # Draw UI
         self.draw_ui()
 
     def draw_ui(self):
-        """Draw game UI."""
+        """Draw game UI (laid out in game units, scaled to the canvas)."""
+        s = self.render_scale
         # Score
-        score_text = self.font.render(f"Score: {self.player.score}", True, WHITE)
-        self.screen.blit(score_text, (10, 10))
+        self.screen.blit(self.hud.text('score', f"Score: {self.player.score}", WHITE), (10 * s, 10 * s))
 
         # Wave
-        wave_text = self.font.render(f"Wave: {self.wave}", True, WHITE)
-        self.screen.blit(wave_text, (SCREEN_WIDTH - 120, 10))
+        self.screen.blit(self.hud.text('wave', f"Wave: {self.wave}", WHITE),
+                         ((SCREEN_WIDTH - 120) * s, 10 * s))
 
         # Lives
         for i in range(self.player.lives):
             pygame.draw.polygon(self.screen, GREEN, [
-                (30 + i * 30, SCREEN_HEIGHT - 20),
-                (20 + i * 30, SCREEN_HEIGHT - 10),
-                (40 + i * 30, SCREEN_HEIGHT - 10)
+                ((30 + i * 30) * s, (SCREEN_HEIGHT - 20) * s),
+                ((20 + i * 30) * s, (SCREEN_HEIGHT - 10) * s),
+                ((40 + i * 30) * s, (SCREEN_HEIGHT - 10) * s)
             ])
 
         # Bombs
         for i in range(self.player.bombs):
-            pygame.draw.circle(self.screen, RED, (SCREEN_WIDTH - 30 - i * 25, SCREEN_HEIGHT - 15), 8)
+            pygame.draw.circle(self.screen, RED, ((SCREEN_WIDTH - 30 - i * 25) * s, (SCREEN_HEIGHT - 15) * s),
+                               SPRITES.size(8))
 
         # Active power-ups
         y_offset = 50
         if self.player.rapid_fire:
-            text = self.font.render(f"Rapid Fire: {self.player.rapid_fire_timer // 60}s", True, YELLOW)
-            self.screen.blit(text, (10, y_offset))
+            text = self.hud.text('rapid_fire', f"Rapid Fire: {self.player.rapid_fire_timer // 60}s", YELLOW)
+            self.screen.blit(text, (10 * s, y_offset * s))
             y_offset += 25
         if self.player.spread_shot:
-            text = self.font.render(f"Spread Shot: {self.player.spread_shot_timer // 60}s", True, CYAN)
-            self.screen.blit(text, (10, y_offset))
+            text = self.hud.text('spread_shot', f"Spread Shot: {self.player.spread_shot_timer // 60}s", CYAN)
+            self.screen.blit(text, (10 * s, y_offset * s))
             y_offset += 25
         if self.player.shield_active:
-            text = self.font.render(f"Shield: {self.player.shield_timer // 60}s", True, BLUE)
-            self.screen.blit(text, (10, y_offset))
+            text = self.hud.text('shield', f"Shield: {self.player.shield_timer // 60}s", BLUE)
+            self.screen.blit(text, (10 * s, y_offset * s))
 
     def draw_pause(self):
         """Draw pause overlay."""
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 128))
-        self.screen.blit(overlay, (0, 0))
-
-        pause_text = self.big_font.render("PAUSED", True, WHITE)
-        resume_text = self.font.render("Press P to Resume", True, GREEN)
-
-        self.screen.blit(pause_text, (SCREEN_WIDTH // 2 - pause_text.get_width() // 2, 250))
-        self.screen.blit(resume_text, (SCREEN_WIDTH // 2 - resume_text.get_width() // 2, 330))
+        self.screen.blit(self.hud.dim(128), (0, 0))
+        self.screen.blit(self.hud.layer('pause'), (0, 0))
 
     def draw_game_over(self):
         """Draw game over screen."""
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        self.screen.blit(overlay, (0, 0))
-
-        game_over = self.big_font.render("GAME OVER", True, RED)
-        score = self.font.render(f"Final Score: {self.player.score}", True, WHITE)
-        high = self.font.render(f"High Score: {self.high_score}", True, YELLOW)
-        restart = self.font.render("Press ENTER to Restart", True, GREEN)
-
-        self.screen.blit(game_over, (SCREEN_WIDTH // 2 - game_over.get_width() // 2, 200))
-        self.screen.blit(score, (SCREEN_WIDTH // 2 - score.get_width() // 2, 290))
-        self.screen.blit(high, (SCREEN_WIDTH // 2 - high.get_width() // 2, 330))
-        self.screen.blit(restart, (SCREEN_WIDTH // 2 - restart.get_width() // 2, 400))
+        self.screen.blit(self.hud.dim(180), (0, 0))
+        self.screen.blit(self.hud.layer('game_over'), (0, 0))
+        self.blit_centered(self.hud.text('final_score', f"Final Score: {self.player.score}", WHITE), 290)
+        self.blit_centered(self.hud.text('high_score', f"High Score: {self.high_score}", YELLOW), 330)
 
     def draw_victory(self):
         """Draw victory screen."""
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        self.screen.blit(overlay, (0, 0))
-
-        victory = self.big_font.render("VICTORY!", True, YELLOW)
-        score = self.font.render(f"Final Score: {self.player.score}", True, WHITE)
-        message = self.font.render("You saved Earth from the alien invasion!", True, CYAN)
-        restart = self.font.render("Press ENTER to Play Again", True, GREEN)
-
-        self.screen.blit(victory, (SCREEN_WIDTH // 2 - victory.get_width() // 2, 200))
-        self.screen.blit(score, (SCREEN_WIDTH // 2 - score.get_width() // 2, 290))
-        self.screen.blit(message, (SCREEN_WIDTH // 2 - message.get_width() // 2, 330))
-        self.screen.blit(restart, (SCREEN_WIDTH // 2 - restart.get_width() // 2, 400))
-
-    def run(self):
-        """Main game loop."""
+        self.screen.blit(self.hud.dim(180), (0, 0))
+        self.screen.blit(self.hud.layer('victory'), (0, 0))
+        self.blit_centered(self.hud.text('final_score', f"Final Score: {self.player.score}", WHITE), 290)
+
+    def run(self, pipelined: bool = False):
+        """Main game loop.
+
+        The simulation advances in fixed SIM_DT ticks from a time accumulator,
+        independent of how often frames are drawn; each frame renders the
+        state interpolated between the last two ticks. If a slow frame leaves
+        more than MAX_CATCHUP_STEPS ticks due, the excess backlog is dropped so
+        the game slows down instead of stalling.
+
+        Each frame's work time feeds the QualityGovernor, which lowers
+        visual detail while frames run over budget.
+
+        With pipelined set, a RenderPipeline simulates the frame's ticks on a
+        worker thread while this thread draws the previous frame. Input and
+        key handling only happen while the worker is idle.
+
+        F3 toggles the frame profiler overlay; with profile_path set, its
+        stats are written there as JSON on exit. While watching a replay,
+        Page Up/Page Down seek back/forward by KEYFRAME_INTERVAL ticks.
+        """
         running = True
+        accumulator = 0.0
+        last_time = time.perf_counter()
+        pipeline = RenderPipeline(self) if pipelined else None
         while running:
+            now = time.perf_counter()
+            accumulator += now - last_time
+            last_time = now
+            if pipeline:
+                # The worker is idle from here until submit()
+                frame = pipeline.wait()
+
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
@@ -982,23 +3356,200 @@ class Game:
                     if event.key == pygame.K_ESCAPE:
                         running = False
                     elif event.key == pygame.K_RETURN:
-                        if self.state == GameState.MENU:
-                            self.state = GameState.PLAYING
-                        elif self.state in (GameState.GAME_OVER, GameState.VICTORY):
-                            self.reset_game()
+                        if self.state in (GameState.MENU, GameState.GAME_OVER, GameState.VICTORY):
+                            if self.recording:
+                                self.start_recording()
+                            elif isinstance(self.input_source, ReplayPlayer):
+                                self.input_source.seek(self, 0)
+                            elif self.state != GameState.MENU:
+                                self.reset_game()
                             self.state = GameState.PLAYING
                     elif event.key == pygame.K_p and self.state in (GameState.PLAYING, GameState.PAUSED):
-                        self.state = GameState.PAUSED if self.state == GameState.PLAYING else GameState.PLAYING
+                        self.keyboard.press(Controls.PAUSE)
                     elif event.key == pygame.K_b and self.state == GameState.PLAYING:
-                        self.use_bomb()
+                        self.keyboard.press(Controls.BOMB)
+                    elif event.key == pygame.K_F3:
+                        self.profiler.visible = not self.profiler.visible
+                    elif (event.key in (pygame.K_PAGEUP, pygame.K_PAGEDOWN)
+                          and isinstance(self.input_source, ReplayPlayer)):
+                        offset = KEYFRAME_INTERVAL if event.key == pygame.K_PAGEDOWN else -KEYFRAME_INTERVAL
+                        self.input_source.seek(self, self.ticks + offset)
+            self.keyboard.sample()
+
+            steps = 0
+            while accumulator >= SIM_DT and steps < MAX_CATCHUP_STEPS:
+                accumulator -= SIM_DT
+                steps += 1
+            if accumulator >= SIM_DT:
+                accumulator = 0.0
+
+            if pipeline:
+                self.profiler.end_frame(self)
+                pipeline.submit(steps, accumulator / SIM_DT)
+                pipeline.render(*frame)
+            else:
+                self.advance(steps)
+                self.draw(accumulator / SIM_DT)
+                self.profiler.end_frame(self)
+            # Pipelined, the live game never draws: the view applies the
+            # settings itself, on this thread, before each render
+            if self.governor.observe(time.perf_counter() - now) and not pipeline:
+                self.apply_quality()
+            self.clock.tick(MAX_RENDER_FPS)
+
+        if pipeline:
+            pipeline.close()
+        if self.spectators is not None:
+            self.spectators.close()
+        if self.profile_path:
+            self.profiler.dump(self.profile_path)
+        if self.scores is not None:
+            self.scores.close()
+        pygame.quit()
 
-            self.update()
-            self.draw()
-            self.clock.tick(FPS)
 
-        pygame.quit()
+class RenderPipeline:
+    """Overlaps simulation with rendering on two threads.
+
+    A worker thread runs each frame's ticks on the live game and then
+    captures the result as a render list: the snapshot() blob, a flat
+    immutable byte string. The caller meanwhile draws the previous frame's
+    render list from a private view game that is only ever restore()d, so
+    the two threads never share entity objects. The worker never calls into
+    SDL either: the live game is marked undrawn, so it builds no sprites,
+    and run() samples the keyboard before each submit(). pygame's blits and
+    flips release the GIL, which is where the overlap comes from. The worker runs
+    exactly the same advance() as single-threaded play, so ticks and their
+    results are identical; frames are drawn one frame later.
+    """
+    def __init__(self, game: 'Game'):
+        self.game = game
+        self.view = Game(max_particles=game.particles.capacity, headless=True, seed=game.seed,
+                         star_density=game.star_density, render_scale=game.render_scale)
+        self.view.screen = game.screen
+        self.view.hud = game.hud
+        self.view.governor = game.governor
+        game.drawn = game.bullets.drawn = False
+        self.jobs = queue.Queue(maxsize=1)
+        self.frames = queue.Queue(maxsize=1)
+        # The first frame shows the state as it is now
+        self.frames.put((game.snapshot(), 1.0, {}))
+        self.pending = True
+        self.worker = threading.Thread(target=self.simulate, name="simulation", daemon=True)
+        self.worker.start()
+
+    def simulate(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            steps, alpha = job
+            try:
+                self.game.advance(steps)
+                self.frames.put((self.game.snapshot(), alpha, self.game.profiler.take()))
+            except BaseException as error:
+                self.frames.put(error)
+                return
+
+    def submit(self, steps: int, alpha: float):
+        """Start simulating the next frame's ticks in the background."""
+        self.jobs.put((steps, alpha))
+        self.pending = True
+
+    def wait(self) -> Tuple[bytes, float]:
+        """Block until the worker is idle; returns its last (render list, alpha)."""
+        frame = self.frames.get()
+        self.pending = False
+        if isinstance(frame, BaseException):
+            raise frame
+        render_list, alpha, timings = frame
+        self.game.profiler.merge(timings)
+        return render_list, alpha
+
+    def render(self, render_list: bytes, alpha: float):
+        """Draw (and present) a render list captured by the worker."""
+        view = self.view
+        view.apply_quality()
+        view.restore(render_list)
+        view.high_score = self.game.high_score
+        self.game.draw(alpha, view)
+
+    def frame(self, steps: int, alpha: float):
+        """One pipelined frame: simulate the next ticks while drawing the last."""
+        render_list = self.wait()
+        self.submit(steps, alpha)
+        self.render(*render_list)
+
+    def close(self):
+        """Let the last job finish and stop the worker."""
+        if self.pending:
+            self.wait()
+        self.jobs.put(None)
+        self.worker.join()
+        game = self.game
+        game.drawn = game.bullets.drawn = True
+        game.bullets.refresh_sprites()
 
 
 if __name__ == "__main__":
-    game = Game()
-    game.run()
+    import argparse
+    parser = argparse.ArgumentParser(description="Space Invaders: Bullet Hell Edition")
+    parser.add_argument('--profile', metavar='PATH',
+                        help='Write frame timing stats to PATH as JSON on exit')
+    parser.add_argument('--seed', type=int, help='Seed for the game (and its recording)')
+    parser.add_argument('--record', metavar='PATH', help='Record the last game played to PATH')
+    parser.add_argument('--replay', metavar='PATH', help='Watch a recorded replay')
+    parser.add_argument('--headless', action='store_true',
+                        help='With --replay or --autopilot: simulate at full speed and print the outcome')
+    parser.add_argument('--seek', type=int, default=0, metavar='TICK',
+                        help='With --replay: start playback at this tick')
+    parser.add_argument('--autopilot', action='store_true', help='Let the built-in Autopilot play')
+    parser.add_argument('--spectate', metavar='ADDRESS',
+                        help='Stream the game to viewers on ADDRESS (unix:/path or [host:]port); '
+                             'watch with space_invaders_spectator.py')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='Simulate on a worker thread while the main thread draws')
+    parser.add_argument('--stars', type=int, default=100, metavar='N',
+                        help='Number of background stars (drawing cost does not depend on it)')
+    parser.add_argument('--render-scale', type=float, default=1.0, metavar='SCALE',
+                        help='Draw at SCALE times the 800x600 game area and scale it to the window '
+                             '(e.g. 0.5 for half resolution)')
+    parser.add_argument('--sdl-scaled', action='store_true',
+                        help="Let SDL's SCALED mode upscale the canvas (resizable, high-DPI aware)")
+    args = parser.parse_args()
+    display_options = {'render_scale': args.render_scale, 'sdl_scaled': args.sdl_scaled}
+
+    if args.replay:
+        replay = Replay.load(args.replay)
+        game = Game.from_replay(replay, headless=args.headless,
+                                **({} if args.headless else display_options))
+        game.input_source.seek(game, args.seek)
+        if args.spectate:
+            game.spectators = SpectatorServer(args.spectate)
+        if args.headless:
+            start = time.perf_counter()
+            game.step(len(replay) - game.ticks)
+            print(f"{game.ticks} ticks in {time.perf_counter() - start:.2f}s: {game.state.name}, "
+                  f"wave {game.wave}, score {game.player.score}")
+        else:
+            game.run(args.pipeline)
+    elif args.autopilot and args.headless:
+        game = Game(headless=True, seed=args.seed, input_source=Autopilot())
+        if args.spectate:
+            game.spectators = SpectatorServer(args.spectate)
+        start = time.perf_counter()
+        game.step(60 * 60 * 60)
+        elapsed = time.perf_counter() - start
+        if game.spectators is not None:
+            game.spectators.close()
+        print(f"{game.ticks} ticks in {elapsed:.2f}s ({game.ticks / elapsed:,.0f} ticks/s): "
+              f"{game.state.name}, wave {game.wave}, score {game.player.score}, lives {game.player.lives}")
+    else:
+        game = Game(seed=args.seed, profile_path=args.profile, star_density=args.stars,
+                    input_source=Autopilot() if args.autopilot else None, **display_options)
+        game.recording = bool(args.record)
+        if args.spectate:
+            game.spectators = SpectatorServer(args.spectate)
+        game.run(args.pipeline)
+        if game.replay is not None and len(game.replay):
+            game.replay.save(args.record)
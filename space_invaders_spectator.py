@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Space Invaders spectator
+Watches a game started with --spectate from a separate process: rebuilds
+the scene from the game's keyframe/delta stream and draws it in its own
+window. The raw stream can be saved and played back later.
+
+Usage:
+    python space_invaders_bullet_hell.py --spectate unix:/tmp/invaders.sock
+    python space_invaders_spectator.py unix:/tmp/invaders.sock --save run.sisp
+    python space_invaders_spectator.py --file run.sisp
+"""
+
+import argparse
+import socket
+import sys
+import time
+
+import pygame
+
+from space_invaders_bullet_hell import (
+    FPS, SCREEN_WIDTH, SCREEN_HEIGHT, Hud, SpectatorFeed, SpectatorScene, parse_address,
+)
+
+HEADER_SIZE = len(SpectatorFeed.MAGIC) + 1
+
+
+def check_header(header: bytes):
+    if header[:4] != SpectatorFeed.MAGIC or header[4] != SpectatorFeed.VERSION:
+        raise ValueError("not a spectator stream, or an unsupported version")
+
+
+def split_messages(buffer: bytearray) -> list:
+    """Pop every complete message payload off the front of buffer."""
+    payloads = []
+    offset = 0
+    size = SpectatorFeed.MESSAGE.size
+    while len(buffer) - offset >= size:
+        length, = SpectatorFeed.MESSAGE.unpack_from(buffer, offset)
+        if len(buffer) - offset - size < length:
+            break
+        payloads.append(bytes(buffer[offset + size:offset + size + length]))
+        offset += size + length
+    del buffer[:offset]
+    return payloads
+
+
+def connect(address: str, timeout: float) -> socket.socket:
+    """Connect to the game, retrying until it is listening or timeout passes."""
+    family, target = parse_address(address)
+    deadline = time.monotonic() + timeout
+    while True:
+        conn = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            conn.connect(target)
+            return conn
+        except OSError:
+            conn.close()
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.25)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('address', nargs='?', help='unix:/path or [host:]port of the game')
+    parser.add_argument('--file', metavar='PATH', help='Play back a saved stream instead')
+    parser.add_argument('--save', metavar='PATH', help='Also write the raw stream to PATH')
+    parser.add_argument('--timeout', type=float, default=10.0,
+                        help='Seconds to keep trying to connect (default: 10)')
+    args = parser.parse_args()
+    if not args.address and not args.file:
+        parser.error("give an address to connect to, or --file")
+
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Space Invaders: Spectator")
+    clock = pygame.time.Clock()
+    hud = Hud({'normal': pygame.font.Font(None, 36)})
+    scene = SpectatorScene()
+    buffer = bytearray()
+
+    conn = None
+    saved = None
+    if args.file:
+        with open(args.file, 'rb') as f:
+            data = f.read()
+        check_header(data[:HEADER_SIZE])
+        buffer.extend(data[HEADER_SIZE:])
+        pending = split_messages(buffer)
+    else:
+        conn = connect(args.address, args.timeout)
+        header = b''
+        while len(header) < HEADER_SIZE:
+            chunk = conn.recv(HEADER_SIZE - len(header))
+            if not chunk:
+                sys.exit("game closed the connection")
+            header += chunk
+        check_header(header)
+        conn.setblocking(False)
+        if args.save:
+            saved = open(args.save, 'wb')
+            saved.write(header)
+
+    received = 0
+    start = time.perf_counter()
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+
+        if conn is not None:
+            # Apply everything that arrived; only the latest tick is drawn
+            while True:
+                try:
+                    chunk = conn.recv(1 << 16)
+                except BlockingIOError:
+                    break
+                if not chunk:
+                    running = False
+                    break
+                received += len(chunk)
+                buffer.extend(chunk)
+                if saved:
+                    saved.write(chunk)
+            for payload in split_messages(buffer):
+                scene.apply(payload)
+        elif pending:
+            # Saved streams play back at one tick per frame
+            scene.apply(pending.pop(0))
+
+        scene.draw(screen, hud)
+        pygame.display.flip()
+        clock.tick(FPS)
+
+    if conn is not None:
+        conn.close()
+        elapsed = time.perf_counter() - start
+        print(f"{scene.frames} ticks, {received / 1024:.0f} KiB in {elapsed:.0f}s "
+              f"({received / max(scene.frames, 1):.0f} bytes/tick)")
+    if saved:
+        saved.close()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()